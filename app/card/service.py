@@ -63,8 +63,13 @@ class CardService:
 
 
     @staticmethod
-    def create_cards_batch(db: Session, game_id: UUID, batch_in: schemas.CardBatchIn) -> list[models.Card]:
-        """Crea un lote de cartas para un juego."""
+    def create_cards_batch(
+        db: Session, game_id: UUID, batch_in: schemas.CardBatchIn, commit: bool = True
+    ) -> list[models.Card]:
+        """
+        Crea un lote de cartas para un juego.
+        Con commit=False solo hace flush y deja el commit al llamador.
+        """
 
         cards = []
         for i, item in enumerate(batch_in.items):
@@ -83,7 +88,10 @@ class CardService:
         db.add_all(cards)
 
         try:
-            db.commit()
+            if commit:
+                db.commit()
+            else:
+                db.flush()
         except IntegrityError as e:
             db.rollback()
             raise GameNotFoundException(game_id) from e
@@ -91,8 +99,9 @@ class CardService:
             db.rollback()
             raise DatabaseCommitException() from e
 
-        for card in cards:
-            db.refresh(card)
+        if commit:
+            for card in cards:
+                db.refresh(card)
         return cards
 
     @staticmethod
@@ -128,7 +137,9 @@ class CardService:
 
 
     @staticmethod
-    def move_card(db: Session, card_id: UUID, move_in: schemas.CardMoveIn) -> models.Card:
+    def move_card(
+        db: Session, card_id: UUID, move_in: schemas.CardMoveIn, commit: bool = True
+    ) -> models.Card:
         card = CardService.get_card_by_id(db, card_id)
         if not card:
             raise CardNotFoundException(card_id)
@@ -173,12 +184,16 @@ class CardService:
 
         # commit con manejo de error
         try:
-            db.commit()
+            if commit:
+                db.commit()
+            else:
+                db.flush()
         except SQLAlchemyError as e:
             db.rollback()
             raise DatabaseCommitException from e
 
-        db.refresh(card)
+        if commit:
+            db.refresh(card)
         return card
 
     @staticmethod
@@ -196,7 +211,13 @@ class CardService:
         return CardService.get_cards_by_owner(db, q.game_id, q.owner, None)
     
     @staticmethod
-    def deal_cards(db: Session, game_id: UUID, jugadores_ids: list[UUID], cartas_por_jugador: int = 6) -> dict[UUID, list[models.Card]]:
+    def deal_cards(
+        db: Session,
+        game_id: UUID,
+        jugadores_ids: list[UUID],
+        cartas_por_jugador: int = 6,
+        commit: bool = True,
+    ) -> dict[UUID, list[models.Card]]:
         resultado: dict[UUID, list[models.Card]] = {pid: [] for pid in jugadores_ids}
 
         
@@ -213,7 +234,7 @@ class CardService:
                 break  # Si se acaban las cartas
             carta = not_so_fast_cards.pop(0)
             move_in = schemas.CardMoveIn(to_owner=CardOwner.PLAYER, player_id=pid)
-            CardService.move_card(db, carta.id, move_in)
+            CardService.move_card(db, carta.id, move_in, commit=commit)
             resultado[pid].append(carta)
 
         remaining_cards = db.query(models.Card).filter(
@@ -225,13 +246,13 @@ class CardService:
             while len(resultado[pid]) < cartas_por_jugador and remaining_cards:
                 carta = remaining_cards.pop(0)
                 move_in = schemas.CardMoveIn(to_owner=CardOwner.PLAYER, player_id=pid)
-                CardService.move_card(db, carta.id, move_in)
+                CardService.move_card(db, carta.id, move_in, commit=commit)
                 resultado[pid].append(carta)
 
         return resultado
     
     @staticmethod
-    def shuffle_deck(db: Session, game_id: UUID):
+    def shuffle_deck(db: Session, game_id: UUID, commit: bool = True):
         deck_cards = db.query(models.Card).filter(
             models.Card.game_id == game_id,
             models.Card.owner == CardOwner.DECK
@@ -241,7 +262,10 @@ class CardService:
         for i, card in enumerate(deck_cards, start=1):
             card.order = i
 
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
 
     @staticmethod
     def moveDeckToPlayer (
@@ -335,7 +359,7 @@ class CardService:
         ).count()
     
     @staticmethod
-    def initialize_draft(db: Session, game_id: UUID) -> list[models.Card]:
+    def initialize_draft(db: Session, game_id: UUID, commit: bool = True) -> list[models.Card]:
         "Inicializa el draft para el game"
        
         #Chequeo que no haya cartas en draft
@@ -367,7 +391,7 @@ class CardService:
         # Cambio de DECK a DRAFT
         for card in draft :
             move_in = schemas.CardMoveIn(to_owner=CardOwner.DRAFT)
-            CardService.move_card(db, card.id, move_in)
+            CardService.move_card(db, card.id, move_in, commit=commit)
         return draft
     
     @staticmethod
@@ -36,7 +36,9 @@ def test_initialize_draft_creates_draft(mock_db, mock_card):
         result = CardService.initialize_draft(mock_db, mock_card.game_id)
 
     assert result == [mock_card]
-    mock_move.assert_called_once_with(mock_db, mock_card.id, schemas.CardMoveIn(to_owner=CardOwner.DRAFT))
+    mock_move.assert_called_once_with(
+        mock_db, mock_card.id, schemas.CardMoveIn(to_owner=CardOwner.DRAFT), commit=True
+    )
 
 def test_initialize_draft_already_has_draft(mock_db, mock_card):
     # draft no vacío
@@ -1,10 +1,11 @@
 import uuid
-from sqlalchemy import String, Integer, Boolean, UUID, ForeignKey, Enum 
+from sqlalchemy import String, Integer, Boolean, UUID, ForeignKey, Enum, inspect, text
 from sqlalchemy.orm import relationship, validates, object_session, Mapped, mapped_column
 from sqlalchemy.types import UUID, JSON
 
 from app.db import Base
 from app.player.models import Player
+from app.secret.models import Secrets
 from app.game.enums import TurnState
 
 class Game(Base):
@@ -17,6 +18,8 @@ class Game(Base):
     min_players: Mapped[int] = mapped_column(Integer, nullable=False)
     max_players: Mapped[int] = mapped_column(Integer, nullable=False)
     ready: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Cantidad de jugadores en la partida; la mantiene PlayerService en cada cambio de partida
+    player_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     current_turn: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("players.id"), nullable = True)
 
 
@@ -111,3 +114,37 @@ class GameTurnState(Base):
     game: Mapped["Game"] = relationship(back_populates="turn_state")
     target_player: Mapped["Player"] = relationship("Player")
     sfp_players: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+
+
+def ensure_player_count_column(engine) -> None:
+    """
+    create_all no agrega columnas a tablas existentes: en una base anterior a
+    player_count, agrega la columna y la completa con los jugadores actuales.
+    """
+    with engine.begin() as conn:
+        columns = {col["name"] for col in inspect(conn).get_columns("games")}
+        if "player_count" in columns:
+            return
+        conn.execute(text(
+            "ALTER TABLE games ADD COLUMN player_count INTEGER NOT NULL DEFAULT 0"
+        ))
+        conn.execute(text(
+            "UPDATE games SET player_count = "
+            "(SELECT count(*) FROM players WHERE players.game_id = games.id)"
+        ))
+
+
+# Índices compuestos agregados después de la primera versión del esquema
+_LOOKUP_INDEXES = (
+    (Player.__table__, "ix_players_game_id_id"),
+    (Secrets.__table__, "ix_secrets_game_revealed_role"),
+)
+
+def ensure_lookup_indexes(engine) -> None:
+    """
+    create_all tampoco agrega índices a tablas existentes: crea en una base
+    anterior los índices de las consultas por partida que todavía falten.
+    """
+    for table, name in _LOOKUP_INDEXES:
+        index = next(ix for ix in table.indexes if ix.name == name)
+        index.create(bind=engine, checkfirst=True)
@@ -2,8 +2,9 @@ from datetime import date
 from typing import List, Optional, Union
 from uuid import UUID
 from fastapi import HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.attributes import flag_modified
 from pathlib import Path
 import json
@@ -18,7 +19,7 @@ from app.player.service import PlayerService
 from app.player.dtos import PlayerInDTO
 from app.player.models import Player
 from app.card.enums import CardOwner
-from app.card.schemas import CardIn, CardBatchIn, CardMoveIn
+from app.card.schemas import CardBatchIn, CardMoveIn
 from app.card.service import CardService
 from app.secret.service import SecretService
 from app.secret.models import Secrets
@@ -27,6 +28,24 @@ from app.websocket.connection_man import manager
 from app.game.turn_timer import turn_timer_manager
 
 
+_CARD_DIR = Path(__file__).resolve().parent.parent / "card"
+
+# Año fijo: solo se compara día/mes de los cumpleaños
+_TARGET_BIRTHDAY_REF = date(2025, 9, 15)
+_TARGET_BIRTHDAY_ORDINAL = _TARGET_BIRTHDAY_REF.toordinal()
+
+
+def _load_card_batch(deck_path: Path) -> CardBatchIn:
+    with deck_path.open("r", encoding="utf-8") as f:
+        return CardBatchIn.model_validate(json.load(f))
+
+
+# Los mazos son fijos: se leen y validan una sola vez al importar el módulo
+_CARD_BATCHES: dict[str, CardBatchIn] = {
+    deck_name: _load_card_batch(_CARD_DIR / deck_name)
+    for deck_name in ("deck.json", "deck2p.json")
+}
+
 
 class GameService:
     def __init__(self, db: Session):
@@ -35,44 +54,69 @@ class GameService:
     def get_games(self, full: bool = False, ready: bool = False) -> List[GameOutDTO]:
         """
         Lista partidas con filtros opcionales:
-          - include_full=True  -> incluye partidas llenas (no aplica HAVING count(players) < max_players)
+          - include_full=True  -> incluye partidas llenas (no filtra player_count < max_players)
           - include_ready=True -> incluye partidas ya iniciadas (no filtra ready == False)
         Por defecto (False/False) filtra juegos disponibles.
+        Igual que en get_game_by_id, el host va primero en players_ids.
         """
-        q = self.db.query(Game).outerjoin(Game.players).group_by(Game.id)
+        stmt = select(Game).options(selectinload(Game.players).load_only(Player.id))
         if not full:
-            q = q.having(func.count(Game.players) < Game.max_players)
+            stmt = stmt.where(Game.player_count < Game.max_players)
         if not ready:
-            q = q.filter(Game.ready == False)
-        games = q.all() or []
+            stmt = stmt.where(Game.ready == False)
+        games = self.db.execute(stmt).scalars().all()
 
         return [
             GameOutDTO(
-                id=g.id,
-                name=g.name,
-                password= g.password,
-                host_id=g.host_id,
-                min_players=g.min_players,
-                max_players=g.max_players,
-                ready=g.ready,
-                players_ids=[p.id for p in g.players],
+                id=game.id,
+                name=game.name,
+                password=game.password,
+                host_id=game.host_id,
+                min_players=game.min_players,
+                max_players=game.max_players,
+                ready=game.ready,
+                players_ids=sorted(
+                    (p.id for p in game.players),
+                    key=lambda pid: (pid != game.host_id, pid),
+                ),
             )
-            for g in games
+            for game in games
         ]
 
     def get_game_by_id(self, game_id: UUID) -> Optional[GameOutDTO]:
-        game = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game:
+        """
+        Arma el DTO con dos consultas acotadas (columnas de la partida e ids
+        de jugadores) sin instanciar el modelo Game. El host va primero.
+        """
+        row = self.db.execute(
+            select(
+                Game.id,
+                Game.name,
+                Game.password,
+                Game.host_id,
+                Game.min_players,
+                Game.max_players,
+                Game.ready,
+            ).where(Game.id == game_id)
+        ).first()
+        if not row:
             return None
+
+        players_ids = self.db.execute(
+            select(Player.id)
+            .where(Player.game_id == game_id)
+            .order_by(Player.id != row.host_id, Player.id)
+        ).scalars().all()
+
         return GameOutDTO(
-            id=game.id,
-            name=game.name,
-            password=game.password,
-            host_id=game.host_id,
-            min_players=game.min_players,
-            max_players=game.max_players,
-            ready=game.ready,
-            players_ids=[p.id for p in game.players],
+            id=row.id,
+            name=row.name,
+            password=row.password,
+            host_id=row.host_id,
+            min_players=row.min_players,
+            max_players=row.max_players,
+            ready=row.ready,
+            players_ids=players_ids,
         )
     
     def get_game_entity_by_id(self, game_id: UUID) -> Optional[Game]:
@@ -101,28 +145,29 @@ class GameService:
 
     def create_game(self, game_data: GameInDTO) -> GameOutDTO:
         player_service = PlayerService(self.db)
-        host_dto = PlayerInDTO(name=game_data.host_name, birthday=game_data.birthday)
-        host = player_service.create_player(host_dto)
-
-        new_game = Game(
-            name=game_data.name,
-            password=game_data.password,
-            host_id=host.id,
-            min_players=game_data.min_players,
-            max_players=game_data.max_players,
-            ready=False,
-        )
-        self.db.add(new_game)
-        self.db.commit()
-        self.db.refresh(new_game)
-
-        # Asignar host al juego
-        host_entity = player_service.get_player_entity_by_id(host.id)
-        if not host_entity:
-            raise Exception("Host player not found after creation")
-        host_entity.game_id = new_game.id
-        self.db.commit()
-        self.db.refresh(host_entity)
+        try:
+            # games.host_id referencia al host: el jugador se inserta primero,
+            # todavía sin partida, y se le asigna una vez insertado el juego
+            host = player_service.create_player(
+                PlayerInDTO(name=game_data.host_name, birthday=game_data.birthday),
+                commit=False,
+            )
+            new_game = Game(
+                name=game_data.name,
+                password=game_data.password,
+                host_id=host.id,
+                min_players=game_data.min_players,
+                max_players=game_data.max_players,
+                ready=False,
+            )
+            self.db.add(new_game)
+            self.db.flush()
+            player_service.assign_game_to_player(host.id, new_game.id, commit=False)
+            # Un único commit para host y partida
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
 
         return GameOutDTO(
             id=new_game.id,
@@ -135,135 +180,175 @@ class GameService:
             players_ids=[host.id],
         )
 
-    def add_player(self, game_id: UUID, join_data: PlayerInDTO) -> Optional[UUID]:
-        game = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game or game.ready or len(game.players) >= game.max_players:
-            return None
+    @staticmethod
+    def _players_count_subquery(game_id: UUID):
+        """Subconsulta escalar con la cantidad de jugadores de un juego."""
+        return (
+            select(func.count(Player.id))
+            .where(Player.game_id == game_id)
+            .scalar_subquery()
+        )
+
+    def _count_players(self, game_id: UUID) -> int:
+        """Cuenta los jugadores de un juego sin cargarlos."""
+        return self.db.execute(
+            select(self._players_count_subquery(game_id))
+        ).scalar()
 
+    def add_player(self, game_id: UUID, join_data: PlayerInDTO) -> Optional[UUID]:
+        # create_player inserta al jugador e incrementa player_count; ese
+        # UPDATE bloquea la fila de la partida hasta el commit, así que la
+        # verificación posterior ve todos los ingresos concurrentes.
         player_service = PlayerService(self.db)
-        new_player = player_service.create_player(join_data)
+        try:
+            new_player = player_service.create_player(
+                join_data, game_id=game_id, commit=False
+            )
+        except IntegrityError:
+            # La partida no existe (con claves foráneas activas)
+            return None
 
-        new_player_entity = player_service.get_player_entity_by_id(new_player.id)
-        if not new_player_entity:
-            raise Exception("Player not found after creation")
-        new_player_entity.game_id = game.id
+        available = self.db.execute(
+            select(Game.id).where(
+                Game.id == game_id,
+                Game.ready == False,
+                Game.player_count <= Game.max_players,
+            )
+        ).first()
+        if available is None:
+            # No existe, ya empezó o se pasó del máximo: se deshace el ingreso
+            self.db.rollback()
+            return None
 
-        self.db.commit()
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
         return new_player.id
 
     def can_start(self, game_id: UUID) -> bool:
-        game = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game:
+        row = self.db.execute(
+            select(
+                Game.ready,
+                Game.min_players,
+                self._players_count_subquery(game_id).label("players_count"),
+            ).where(Game.id == game_id)
+        ).first()
+        if not row:
             return False
-        return len(game.players) >= game.min_players and not game.ready
+        return not row.ready and row.players_count >= row.min_players
 
     def first_player(self, game_id: UUID) -> Optional[UUID]:
-        target_date = date(
-            year=2025, month=9, day=15
-        )  # usamos año fijo solo para comparar día/mes
         player_serv = PlayerService(self.db)
         players = player_serv.get_players_by_game_id(game_id)
+        return self._first_player_from_players(players)
 
+    @staticmethod
+    def _first_player_from_players(players: list[Player]) -> Optional[UUID]:
+        """Elige el primer jugador entre jugadores ya cargados."""
         if not players:
             return None
 
         def diff(player):
-            # Convertir cumpleaños a año 2025
-            bday = player.birthday.replace(year=2025)
-            delta = abs((bday - target_date).days)
-            return delta
+            # Día del cumpleaños en el año de referencia (el 29/02 cuenta como 01/03)
+            month, day = player.birthday.month, player.birthday.day
+            if month == 2 and day == 29:
+                month, day = 3, 1
+            bday = date(_TARGET_BIRTHDAY_REF.year, month, day).toordinal()
+            return abs(bday - _TARGET_BIRTHDAY_ORDINAL)
 
         # Retornar ID del jugador con menor diferencia
         return min(players, key=diff).id
 
     def next_player(self, game_id: UUID) -> Union[UUID, EndGameResult]:
         game = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game or len(game.players) < game.min_players:
-            raise ValueError(f"El juego {game_id} no está iniciado o no hay suficientes jugadores")         
+        if not game or self._count_players(game_id) < game.min_players:
+            raise ValueError(f"El juego {game_id} no está iniciado o no hay suficientes jugadores")         
 
         current_player_id = game.current_turn
-        players = sorted(game.players, key=lambda p: p.id)
+        players_in_order = (
+            select(Player.id)
+            .where(Player.game_id == game_id)
+            .order_by(Player.id)
+        )
 
-        if not players:
-            raise ValueError(f"El juego {game_id} no tiene jugadores")
+        # El jugador actual y el siguiente (por UUID) en una sola consulta
+        candidates = []
+        if current_player_id is not None:
+            candidates = self.db.execute(
+                players_in_order.where(Player.id >= current_player_id).limit(2)
+            ).scalars().all()
 
-        for idx, player in enumerate(players):
-            if player.id == current_player_id:
-                next_idx = (idx + 1) % len(players)
-                game.current_turn = players[next_idx].id
-                if game.turn_state:
-                    game.turn_state.state = TurnState.IDLE
-                else:
-                    # Si no existe, lo creamos
-                    game.turn_state = GameTurnState(
-                        game_id=game.id,
-                        state=TurnState.IDLE
-                    )
-                self.db.commit()
-                return players[next_idx].id
-
-        game.current_turn = players[0].id
+        if candidates and candidates[0] == current_player_id:
+            if len(candidates) > 1:
+                next_player_id = candidates[1]
+            else:
+                # El actual es el último: se vuelve al primero
+                next_player_id = self.db.execute(players_in_order.limit(1)).scalar()
+            game.current_turn = next_player_id
+            if game.turn_state:
+                game.turn_state.state = TurnState.IDLE
+            else:
+                # Si no existe, lo creamos
+                game.turn_state = GameTurnState(
+                    game_id=game.id,
+                    state=TurnState.IDLE
+                )
+            self.db.commit()
+            return next_player_id
+
+        first_player_id = self.db.execute(players_in_order.limit(1)).scalar()
+        if first_player_id is None:
+            raise ValueError(f"El juego {game_id} no tiene jugadores")
+        game.current_turn = first_player_id
         self.db.commit()
-        return players[0].id
+        return first_player_id
 
     def start_game(self, game_id: UUID, deck_json: dict | None = None) -> bool:
         game = self.db.query(Game).filter(Game.id == game_id).first()
         if not game or len(game.players) < game.min_players:
             return False
 
-        game.current_turn = self.first_player(game_id)
+        jugadores = list(game.players)
+        jugadores_ids = [p.id for p in jugadores]
+        game.current_turn = self._first_player_from_players(jugadores)
 
         game.ready = True
-        self.db.commit()  # Marcamos la partida como lista y setea first player
 
-        # Usar deck_json pasado como parámetro o leer desde archivo
+        # Usar deck_json pasado como parámetro o el mazo precargado
         if deck_json is None:
-            if len(game.players) == 2:
-                deck_path = Path(__file__).parent.parent / "card" / "deck2p.json"
-            else:
-                deck_path = Path(__file__).parent.parent / "card" / "deck.json"
-            
-            with deck_path.open("r", encoding="utf-8") as f:    
-                deck_json = json.load(f)
-
-        assert deck_json is not None
-
-        cartas_json_payload = CardBatchIn(
-            items=[
-                CardIn(
-                    type=item["type"],
-                    name=item["name"],
-                    description=item["description"],
-                )
-                for item in deck_json["items"]
-            ]
-        )
-
-        # Crear cartas en la DB
-        CardService.create_cards_batch(self.db, game.id, cartas_json_payload)
-        CardService.shuffle_deck(self.db,game_id)
-
-        # Repartir cartas a los jugadores
-        player_service = PlayerService(self.db)
-        jugadores = player_service.get_players_by_game_id(game.id)
-        jugadores_ids = [p.id for p in jugadores]
-
-        # Repartir 6 cartas por jugador
-        CardService.deal_cards(self.db, game.id, jugadores_ids, cartas_por_jugador=6)
-
-        # Inicializa el draft
-        draft = CardService.initialize_draft(self.db, game.id)
-        assert draft != None
+            deck_name = "deck2p.json" if len(jugadores) == 2 else "deck.json"
+            cartas_json_payload = _CARD_BATCHES[deck_name]
+        else:
+            cartas_json_payload = CardBatchIn.model_validate(deck_json)
+
+        # Todo el armado de la partida va en una sola transacción:
+        # los servicios solo hacen flush y se commitea una vez al final
+        try:
+            # Crear cartas en la DB
+            CardService.create_cards_batch(self.db, game.id, cartas_json_payload, commit=False)
+            CardService.shuffle_deck(self.db, game_id, commit=False)
+
+            # Repartir 6 cartas por jugador
+            CardService.deal_cards(self.db, game.id, jugadores_ids, cartas_por_jugador=6, commit=False)
+
+            # Inicializa el draft
+            draft = CardService.initialize_draft(self.db, game.id, commit=False)
+            assert draft != None
+
+            # Inicializar y repartir los secretos
+            SecretService.create_secrets(self.db, game.id, jugadores_ids, commit=False)
+            SecretService.deal_secrets(self.db, game.id, jugadores_ids, commit=False)
+            game.turn_state = GameTurnState(
+                game_id=game.id,
+                state=TurnState.IDLE
+            )
 
-        # Inicializar y repartir los secretos
-        SecretService.create_secrets(self.db, game.id, jugadores_ids)
-        SecretService.deal_secrets(self.db, game.id, jugadores_ids)   
-        game.turn_state = GameTurnState(
-            game_id=game.id,
-            state=TurnState.IDLE
-        )
-        
-        self.db.commit()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         return True
 
     def get_turn(self, game_id: UUID) -> Optional[UUID]:
@@ -276,80 +361,71 @@ class GameService:
     def are_all_other_secrets_revealed(self, game_id: UUID) -> bool:
         '''
         Verifica si todos los secretos de los demás jugadores, excepto
-        del asesino fueron revelados
+        del asesino fueron revelados. La base corta en el primer secreto
+        sin revelar.
         '''
-        all_secrets = self.db.query(Secrets).filter(Secrets.game_id == game_id).all()
-
-        unrevealed_secrets = any(
-            not secret.revealed and secret.role != SecretType.MURDERER
-            for secret in all_secrets
+        unrevealed_exists = (
+            select(Secrets.id)
+            .where(
+                Secrets.game_id == game_id,
+                Secrets.revealed == False,
+                Secrets.role != SecretType.MURDERER,
+            )
+            .exists()
         )
-
-        return not unrevealed_secrets
+        return not self.db.execute(select(unrevealed_exists)).scalar()
 
     def end_game(
         self,
         game_id: UUID, 
         reason: GameEndReason
     ) -> EndGameResult:
-        game = (
-            self.db.query(Game)
-            .options(joinedload(Game.players), joinedload(Game.secrets))
-            .filter(Game.id == game_id)
-            .first()
-        )
-        if not game:
+        game_exists = self.db.execute(
+            select(Game.id).where(Game.id == game_id)
+        ).first()
+        if not game_exists:
             raise ValueError(f"Game {game_id} not found")
-        
-        murderer_id = None
-        accomplice_id = None
-        player_roles_map = {p.id: PlayerRole.DETECTIVE for p in game.players}
-
-        for secret in game.secrets:
-            if secret.owner_player_id:
-                if secret.role == SecretType.ACCOMPLICE:
-                    accomplice_id = secret.owner_player_id
-                    player_roles_map[secret.owner_player_id] = PlayerRole.ACCOMPLICE
-                elif secret.role == SecretType.MURDERER:
-                    murderer_id = secret.owner_player_id
-                    player_roles_map[secret.owner_player_id] = PlayerRole.MURDERER
+
+        # Solo se leen las columnas necesarias, sin hidratar entidades ORM
+        players_rows = self.db.execute(
+            select(Player.id, Player.name).where(Player.game_id == game_id)
+        ).all()
+        secrets_rows = self.db.execute(
+            select(Secrets.owner_player_id, Secrets.role).where(
+                Secrets.game_id == game_id,
+                Secrets.owner_player_id.is_not(None),
+                Secrets.role.in_((SecretType.ACCOMPLICE, SecretType.MURDERER)),
+            )
+        ).all()
+
+        # Solo asesino y cómplice tienen rol especial, el resto son detectives
+        special_roles: dict[UUID, PlayerRole] = {}
+        for owner_player_id, secret_role in secrets_rows:
+            if secret_role == SecretType.ACCOMPLICE:
+                special_roles[owner_player_id] = PlayerRole.ACCOMPLICE
+            else:
+                special_roles[owner_player_id] = PlayerRole.MURDERER
 
         winning_team: WinningTeam
-        winners_ids: set[UUID] = set()
 
-        if reason in [GameEndReason.DECK_EMPTY, GameEndReason.SECRETS_REVEALED]:
+        if reason in (GameEndReason.DECK_EMPTY, GameEndReason.SECRETS_REVEALED):
             winning_team = WinningTeam.MURDERERS
-            if murderer_id:
-                winners_ids.add(murderer_id)
-            if accomplice_id:
-                winners_ids.add(accomplice_id)
-        
         elif reason == GameEndReason.MURDERER_REVEALED:
             winning_team = WinningTeam.DETECTIVES
-            all_players_ids = {p.id for p in game.players}
-            murderer_team_ids = {murderer_id, accomplice_id}
-            winners_ids = all_players_ids - murderer_team_ids
-
         else:
             raise ValueError(f"Invalid game end reason: {reason}")
 
-        winners_list = [
-            PlayerSummary(
-                id=p.id,
-                name=p.name
-            )
-            for p in game.players
-            if p.id in winners_ids
-        ]
-        
-        player_roles_list = [
-            PlayerRoleInfo(
-                id = p.id,
-                name = p.name,
-                role = player_roles_map[p.id]
+        murderers_win = winning_team == WinningTeam.MURDERERS
+        winners_list: list[PlayerSummary] = []
+        player_roles_list: list[PlayerRoleInfo] = []
+
+        for player_id, player_name in players_rows:
+            role = special_roles.get(player_id, PlayerRole.DETECTIVE)
+            player_roles_list.append(
+                PlayerRoleInfo(id=player_id, name=player_name, role=role)
             )
-            for p in game.players
-        ]
+            if (role != PlayerRole.DETECTIVE) == murderers_win:
+                winners_list.append(PlayerSummary(id=player_id, name=player_name))
 
         result_dto = EndGameResult(
             reason = reason,
@@ -378,7 +454,7 @@ class GameService:
             is_cancelled=turn_state.is_canceled_card,
             last_is_canceled_card=turn_state.last_is_canceled_card,
             vote_data=turn_state.vote_data,
-            sfp_players=[str(p) for p in turn_state.sfp_players] if turn_state.sfp_players else None
+            sfp_players=turn_state.sfp_players or None
         )
     
     def change_turn_state(
@@ -421,11 +497,7 @@ class GameService:
             game_obj.turn_state.vote_data = None
 
         elif new_state == TurnState.CARD_TRADE_PENDING:
-            required_fields = [
-                current_event_card_id,
-                card_trade_offered_card_id,
-            ]
-            if any(value is None for value in required_fields):
+            if current_event_card_id is None or card_trade_offered_card_id is None:
                 raise ValueError("Se requieren datos de Card Trade para este estado")
             game_obj.turn_state.passing_direction = None
             game_obj.turn_state.current_event_card_id = current_event_card_id
@@ -518,17 +590,12 @@ class GameService:
 
         else:
             id_next_player = result
+            # Un solo mensaje con el fin del turno y el siguiente jugador
             await manager.broadcast_to_game(
-                game_id, {"type" : "endTimer", 
+                game_id, {"type" : "turnTransition", 
                           "data": {
-                              "player_id":str(current_turn)
-                          }}
-            )
-    
-            await manager.broadcast_to_game(
-                game_id, {"type" : "turnChange", 
-                          "data": {
-                              "player_id":str(id_next_player)
+                              "ended": str(current_turn),
+                              "next": str(id_next_player)
                           }}
             )
             
@@ -580,13 +647,16 @@ class GameService:
         Encuentra al jugador anterior y al siguiente en el orden de turno (por UUID).
         Devuelve una tupla (previous_player, next_player).
         """
-        players = self.db.query(Player).filter(Player.game_id == game_id).all()
+        sorted_players = (
+            self.db.query(Player)
+            .filter(Player.game_id == game_id)
+            .order_by(Player.id)
+            .all()
+        )
 
-        if not players or len(players) < 2:
+        if not sorted_players or len(sorted_players) < 2:
             return (None, None)
 
-        sorted_players = sorted(players, key=lambda p: p.id)
-
         # Encontrar el índice del jugador actual
         current_index = -1
         for i, p in enumerate(sorted_players):
@@ -632,8 +702,6 @@ class GameService:
             self.db.commit()
             return True
         else:
-            self.db.delete(player_to_remove) 
-
-            self.db.commit()
+            player_service.delete_player(player_id)
             return True
     
\ No newline at end of file
@@ -0,0 +1,7 @@
+import itertools
+import uuid
+
+# UUIDs deterministas para los tests que solo necesitan *algún* id;
+# las claves primarias que se insertan siguen usando uuid4.
+# El prefijo 0xF evita un hex todo numérico, que sqlite guardaría como entero.
+uids = (uuid.UUID(int=(0xF << 124) | i) for i in itertools.count(1))
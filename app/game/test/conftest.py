@@ -0,0 +1,69 @@
+import json
+import types
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+
+
+# Base de datos de prueba en memoria, compartida por los tests de app/game
+@pytest.fixture(scope="session")
+def engine():
+    """Un único engine en memoria con el esquema creado una sola vez."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqlite no maneja bien los SAVEPOINT: dejamos que SQLAlchemy emita BEGIN
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    # La base es descartable: sin fsync ni journal en disco
+    @event.listens_for(engine, "connect")
+    def _fast_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def db_session(engine):
+    """
+    Sesión por test dentro de una transacción externa que se revierte al
+    final; los commit() de los servicios solo liberan SAVEPOINTs.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    Session = sessionmaker(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+    session = Session()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture(scope="session")
+def deck_json():
+    # Se lee una sola vez por sesión y se comparte entre tests: solo lectura
+    deck_path = Path("app/card/deck.json")
+    return types.MappingProxyType(json.loads(deck_path.read_text(encoding="utf-8")))
@@ -1,11 +1,12 @@
+import asyncio
 import pytest
+import re
+import types
 import uuid
-import json
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from datetime import date
-from pathlib import Path
-from unittest.mock import AsyncMock, mock_open, MagicMock, patch, ANY
+from sqlalchemy import create_engine, event, func, insert, inspect, select, text
+from sqlalchemy.orm import selectinload, sessionmaker
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, ANY
 from fastapi import HTTPException
 
 from app.db import Base
@@ -15,35 +16,38 @@ from app.card.schemas import CardIn, CardBatchIn
 from app.card.service import CardService
 from app.player.models import Player
 from app.game.enums import GameEndReason, WinningTeam, TurnState
-from app.game.models import Game
+from app.game.models import Game, ensure_player_count_column, ensure_lookup_indexes
 from app.game.models import GameTurnState
-from app.game.service import GameService
+from app.game.service import GameService, _CARD_BATCHES
 from app.game.schemas import GameIn, EndGameResult, CurrentTurnResponse, GameTurnStateOut
 from app.game.dtos import GameInDTO
 from app.player.dtos import PlayerInDTO
 from app.secret.models import Secrets
 from app.secret.enums import SecretType
 from app.secret.service import SecretService
-
-
-# Configuración de la base de datos de prueba en memoria
-@pytest.fixture(scope="function")
-def db_session():
-    engine = create_engine("sqlite:///:memory:", echo=False)
-    Game.__table__.create(engine)
-    Player.__table__.create(engine)
-    Card.__table__.create(engine)
-    Secrets.__table__.create(engine)
-    GameTurnState.__table__.create(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    yield session
-    session.close()
-    Game.__table__.drop(engine)
-    Player.__table__.drop(engine)
-    Card.__table__.drop(engine)
-    Secrets.__table__.drop(engine)
-    GameTurnState.__table__.drop(engine)
+from app.game.test import uids
+
+# Jugadores extra para unir a partidas: se validan una sola vez al importar
+_EXTRA_PLAYERS = tuple(
+    PlayerInDTO(name=f"Player{i}", birthday=date(2000, 1, i)) for i in range(2, 7)
+)
+
+# Mensajes de error de submit_player_vote, compilados una sola vez
+_ERR_NOT_VOTING = re.compile("Not in a voting phase")
+_ERR_SELF_VOTE = re.compile("Cannot vote for oneself")
+_ERR_TWICE = re.compile("Player has already voted")
+
+def _game_dto(**overrides):
+    """GameInDTO con valores por defecto; cada test pisa solo lo que le importa."""
+    fields = {
+        "name": "Test Game",
+        "host_name": "Host",
+        "birthday": date(2000, 1, 1),
+        "min_players": 2,
+        "max_players": 3,
+        **overrides,
+    }
+    return GameInDTO(**fields)
 
 @pytest.fixture(scope="function")
 def game_service(db_session):
@@ -52,93 +56,152 @@ def game_service(db_session):
 # --- Crear juegos ---
 @pytest.mark.parametrize("min_p,max_p", [(2,2), (2,6), (6,6)])
 def test_create_game_edge_limits(game_service, min_p, max_p):
-    dto = GameInDTO(name="Edge Game", host_name=str(uuid.uuid4), birthday=date(2000,1,1),
-                     min_players=min_p, max_players=max_p)
+    dto = _game_dto(name="Edge Game", min_players=min_p, max_players=max_p)
     game = game_service.create_game(dto)
     assert game.min_players == min_p
     assert game.max_players == max_p
     assert game.players_ids[0] == game.host_id
 
 def test_create_game_invalid_max_less_than_min(game_service):
-    dto = GameInDTO(name="Invalid Game", host_name=str(uuid.uuid4), birthday=date(2000,1,1),
-                     min_players=4, max_players=2)
+    dto = _game_dto(name="Invalid Game", min_players=4, max_players=2)
     with pytest.raises(ValueError):
         game_service.create_game(dto)
 
-def test_create_game_invalid_min_max_out_of_bounds(game_service):
-    # min_players < 2
+# Validaciones que no necesitan base de datos
+@pytest.mark.parametrize("min_p,max_p", [
+    (1, 3),  # min_players < 2
+    (2, 7),  # max_players > 6
+])
+def test_create_game_invalid_min_max_out_of_bounds(min_p, max_p):
     with pytest.raises(ValueError):
-        game_in = GameIn(
-            name="Invalid Min",
-            host=uuid.uuid4(),
+        GameIn(
+            name="Invalid Limits",
+            host=next(uids),
             birthday=date(2000,1,1),
-            min_players=1,  # inválido
-            max_players=3
+            min_players=min_p,
+            max_players=max_p
         )
-        game_service.create_game(game_in.to_dto())
 
-    # max_players > 6
+@pytest.mark.parametrize("min_p,max_p", [(-1, 4), (4, 2)])
+def test_game_model_rejects_invalid_limits(min_p, max_p):
     with pytest.raises(ValueError):
-        game_in = GameIn(
-            name="Invalid Max",
-            host=uuid.uuid4(),
-            birthday=date(2000,1,1),
-            min_players=2,
-            max_players=7  # inválido
-        )
-        game_service.create_game(game_in.to_dto())
+        Game(name="Bad Limits", host_id=next(uids), min_players=min_p, max_players=max_p)
+
+@pytest.mark.parametrize("name,birthday", [
+    ("", date(2000, 1, 1)),
+    ("Future", date.today() + timedelta(days=365)),
+])
+def test_player_model_rejects_invalid_fields(name, birthday):
+    with pytest.raises(ValueError):
+        Player(name=name, birthday=birthday)
 
 def test_create_game_without_pass(game_service):
     "Prueba crear un juego sin contraseña"
-    game_in = GameInDTO(
-            name="Summoner's rift",
-            host_name=str(uuid.uuid4()),
-            birthday=date(2000,1,1),
-            min_players=2,
-            max_players=3
-    )
+    game_in = _game_dto(name="Summoner's rift")
     new_game=game_service.create_game(game_in)
     assert not new_game.password
 
 def test_create_game_with_pass(game_service):
     "Prueba crear un juego con contraseña"
-    game_in = GameInDTO(
-            name="Summoner's rift",
-            host_name=str(uuid.uuid4()),
-            password = "Diego&ChunSonLo+",
-            birthday=date(2000,1,1),
-            min_players=2,
-            max_players=3
-    )
+    game_in = _game_dto(name="Summoner's rift", password="Diego&ChunSonLo+")
     new_game=game_service.create_game(game_in)
     assert new_game.password
     assert new_game.password == "Diego&ChunSonLo+"
 
+def test_create_game_with_foreign_keys_enforced():
+    """El host se inserta antes que la partida que lo referencia (games.host_id)."""
+    fk_engine = create_engine("sqlite:///:memory:")
+
+    @event.listens_for(fk_engine, "connect")
+    def _foreign_keys_on(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(fk_engine)
+    with sessionmaker(bind=fk_engine)() as session:
+        game = GameService(session).create_game(_game_dto())
+        assert session.get(Player, game.host_id).game_id == game.id
+        assert session.get(Game, game.id).player_count == 1
+    fk_engine.dispose()
+
+def test_ensure_player_count_column_backfills_legacy_db():
+    """Una base sin player_count recibe la columna con la cantidad real de jugadores."""
+    legacy_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(legacy_engine)
+    with sessionmaker(bind=legacy_engine)() as session:
+        game = GameService(session).create_game(_game_dto())
+        _seed_players(session, game.id, 2)
+    with legacy_engine.begin() as conn:
+        conn.execute(text("ALTER TABLE games DROP COLUMN player_count"))
+
+    ensure_player_count_column(legacy_engine)
+    ensure_player_count_column(legacy_engine)  # la segunda vez no hace nada
+
+    with legacy_engine.connect() as conn:
+        assert conn.execute(select(Game.player_count)).scalar_one() == 3
+    legacy_engine.dispose()
+
+def test_ensure_lookup_indexes_on_existing_tables():
+    """Una base creada antes de los índices compuestos los recibe al arrancar."""
+    legacy_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(legacy_engine)
+    with legacy_engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_players_game_id_id"))
+        conn.execute(text("DROP INDEX ix_secrets_game_revealed_role"))
+
+    ensure_lookup_indexes(legacy_engine)
+    ensure_lookup_indexes(legacy_engine)  # la segunda vez no hace nada
+
+    inspector = inspect(legacy_engine)
+    assert "ix_players_game_id_id" in {ix["name"] for ix in inspector.get_indexes("players")}
+    assert "ix_secrets_game_revealed_role" in {ix["name"] for ix in inspector.get_indexes("secrets")}
+    legacy_engine.dispose()
+
 # --- Obtener juegos ---
 def test_get_games_multiple(game_service):
-    dto1 = GameInDTO(name="Game 1", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=4)
-    dto2 = GameInDTO(name="Game 2", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=3)
+    dto1 = _game_dto(name="Game 1", min_players=2, max_players=4)
+    dto2 = _game_dto(name="Game 2", min_players=2, max_players=3)
     game_service.create_game(dto1)
     game_service.create_game(dto2)
     games = game_service.get_games()
     assert len(games) == 2
     assert set(g.name for g in games) == {"Game 1", "Game 2"}
 
+def test_get_games_filters_full_games(game_service):
+    dto_full = _game_dto(name="Full", min_players=2, max_players=2)
+    dto_open = _game_dto(name="Open", min_players=2, max_players=3)
+    full_game = game_service.create_game(dto_full)
+    game_service.create_game(dto_open)
+    game_service.add_player(full_game.id, PlayerInDTO(name="P2", birthday=date(2001,1,1)))
+
+    assert [g.name for g in game_service.get_games()] == ["Open"]
+    games = {g.name: g for g in game_service.get_games(full=True)}
+    assert set(games) == {"Full", "Open"}
+    assert len(games["Full"].players_ids) == 2
+
+def test_get_games_lists_game_again_after_player_leaves(game_service):
+    dto = _game_dto(name="Leave", min_players=2, max_players=2)
+    game = game_service.create_game(dto)
+    p2 = game_service.add_player(game.id, PlayerInDTO(name="P2", birthday=date(2001,1,1)))
+    assert game_service.get_games() == []
+
+    assert game_service.remove_player(game.id, p2)
+    assert [g.id for g in game_service.get_games()] == [game.id]
+
 def test_get_game_by_id(game_service):
-    dto = GameInDTO(name="Game Exist", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=4)
+    dto = _game_dto(name="Game Exist", min_players=2, max_players=4)
     game = game_service.create_game(dto)
     fetched = game_service.get_game_by_id(game.id)
     assert fetched.id == game.id
     assert fetched.name == "Game Exist"
 
 def test_get_game_by_id_nonexistent(game_service):
-    fetched = game_service.get_game_by_id(uuid.uuid4())
+    fetched = game_service.get_game_by_id(next(uids))
     assert fetched is None
 
 
 # --- Agregar jugadores ---
 def test_add_player_success(game_service):
-    dto = GameInDTO(name="Add Player", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=3)
+    dto = _game_dto(name="Add Player", min_players=2, max_players=3)
     game = game_service.create_game(dto)
     player = PlayerInDTO(name="Extra", birthday=date(2005,5,5))
     pid = game_service.add_player(game.id, player)
@@ -147,38 +210,46 @@ def test_add_player_success(game_service):
     assert len(updated_game.players_ids) == 2
 
 def test_add_player_max_reached(game_service):
-    dto = GameInDTO(name="Full Game", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=2)
+    dto = _game_dto(name="Full Game", min_players=2, max_players=2)
     game = game_service.create_game(dto)
     game_service.add_player(game.id, PlayerInDTO(name="Player2", birthday=date(2001,1,1)))
     result = game_service.add_player(game.id, PlayerInDTO(name="Player3", birthday=date(2002,2,2)))
     assert result is None
+    # El intento rechazado no reserva lugar ni crea jugador
+    assert game_service.db.get(Game, game.id).player_count == 2
+    assert len(game_service.get_game_by_id(game.id).players_ids) == 2
 
-deck_path = Path("app/card/deck.json")
-with deck_path.open("r", encoding="utf-8") as f:
-    deck_json = json.load(f)
-
-def test_add_player_after_game_started(game_service):
-    dto = GameInDTO(name="Ready Game", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=3)
+def test_add_player_invalid_name_keeps_player_count(game_service):
+    game = game_service.create_game(_game_dto(name="Invalid Join", max_players=3))
+    with pytest.raises(ValueError):
+        game_service.add_player(game.id, PlayerInDTO(name="", birthday=date(2001,1,1)))
+    # El ingreso fallido no deja un incremento pendiente para el próximo commit
+    assert game_service.add_player(game.id, _EXTRA_PLAYERS[0]) is not None
+    assert game_service.db.get(Game, game.id).player_count == 2
+    assert len(game_service.get_game_by_id(game.id).players_ids) == 2
+
+def test_add_player_after_game_started(game_service, deck_json):
+    dto = _game_dto(name="Ready Game", min_players=2, max_players=3)
     game = game_service.create_game(dto)
     game_service.add_player(game.id, PlayerInDTO(name="Second Player", birthday=date(2001,1,1)))
     
     # Pasamos el deck_json al iniciar la partida
     game_service.start_game(game.id, deck_json=deck_json)
-    game = game_service.db.query(Game).filter(Game.id == game.id).first()
+    game = game_service.db.get(Game, game.id)
     result = game_service.add_player(game.id, PlayerInDTO(name="Late Player", birthday=date(2003,3,3)))
     assert result is None
 
 
 # --- Lógica de inicio de juego ---
 def test_can_start_logic(game_service):
-    dto = GameInDTO(name="Start Logic", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=4)
+    dto = _game_dto(name="Start Logic", min_players=2, max_players=4)
     game = game_service.create_game(dto)
     assert not game_service.can_start(game.id)  # solo host
     game_service.add_player(game.id, PlayerInDTO(name="Player2", birthday=date(2002,2,2)))
     assert game_service.can_start(game.id)
 
-def test_start_game_success(game_service):
-    dto = GameInDTO(name="Start Game", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=2)
+def test_start_game_success(game_service, deck_json):
+    dto = _game_dto(name="Start Game", min_players=2, max_players=2)
     game = game_service.create_game(dto)
     game_service.add_player(game.id, PlayerInDTO(name="Second Player", birthday=date(2001,1,1)))
     
@@ -189,8 +260,34 @@ def test_start_game_success(game_service):
     updated_game = game_service.get_game_by_id(game.id)
     assert updated_game.ready
 
+def test_start_game_rolls_back_everything_on_failure(game_service, db_session, deck_json, monkeypatch):
+    dto = _game_dto(name="Start Rollback", min_players=2, max_players=2)
+    game = game_service.create_game(dto)
+    game_service.add_player(game.id, PlayerInDTO(name="Second Player", birthday=date(2001,1,1)))
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("falló el reparto")
+
+    monkeypatch.setattr("app.game.service.SecretService.deal_secrets", boom)
+    with pytest.raises(RuntimeError):
+        game_service.start_game(game.id, deck_json=deck_json)
+
+    # Nada del armado quedó persistido
+    assert not game_service.get_game_by_id(game.id).ready
+    assert db_session.scalar(select(func.count()).select_from(Card).where(Card.game_id == game.id)) == 0
+    assert db_session.scalar(select(func.count()).select_from(Secrets).where(Secrets.game_id == game.id)) == 0
+
+def test_first_player_closest_birthday_handles_leap_day():
+    closest = types.SimpleNamespace(id=next(uids), birthday=date(1990, 9, 10))
+    leap_day = types.SimpleNamespace(id=next(uids), birthday=date(2000, 2, 29))
+    far = types.SimpleNamespace(id=next(uids), birthday=date(1995, 1, 1))
+
+    assert GameService._first_player_from_players([far, leap_day, closest]) == closest.id
+    assert GameService._first_player_from_players([far, leap_day]) == leap_day.id
+    assert GameService._first_player_from_players([]) is None
+
 def test_start_game_fail_min_players(game_service):
-    dto = GameInDTO(name="Start Fail", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=3)
+    dto = _game_dto(name="Start Fail", min_players=2, max_players=3)
     game = game_service.create_game(dto)
     result = game_service.start_game(game.id)
     assert not result
@@ -198,7 +295,7 @@ def test_start_game_fail_min_players(game_service):
 
 # --- Host siempre incluido ---
 def test_host_always_in_players(game_service):
-    dto = GameInDTO(name="Host Check", host_name=str(uuid.uuid4), birthday=date(2000,1,1), min_players=2, max_players=3)
+    dto = _game_dto(name="Host Check", min_players=2, max_players=3)
     game = game_service.create_game(dto)
     assert game.players_ids[0] == game.host_id
     # Agrego jugadores extra
@@ -206,24 +303,25 @@ def test_host_always_in_players(game_service):
     game_service.add_player(game.id, PlayerInDTO(name="P3", birthday=date(2003,3,3)))
     updated_game = game_service.get_game_by_id(game.id)
     assert updated_game.players_ids[0] == game.host_id
+    listed = next(g for g in game_service.get_games(full=True) if g.id == game.id)
+    assert listed.players_ids == updated_game.players_ids
 
 # --- Tests para next_player y end_game (corregidos) ---
 def test_next_player_normal_flow(game_service, db_session):
     # Crear juego y dos jugadores
-    dto = GameInDTO(name="Turn Test", host_name=str(uuid.uuid4),
-                    birthday=date(2000,1,1), min_players=2, max_players=3)
+    dto = _game_dto(name="Turn Test", min_players=2, max_players=3)
     game_dto = game_service.create_game(dto)
     p2_id = game_service.add_player(game_dto.id, PlayerInDTO(name="Player2", birthday=date(2001,1,1)))
 
     # Obtener objeto ORM
-    game = db_session.query(Game).filter(Game.id == game_dto.id).first()
+    game = db_session.get(Game, game_dto.id)
 
     # Crear cartas en mazo para que next_player pueda avanzar
     CardService.create_card(db_session, game.id,
                             CardIn(type=CardType.EVENT, name="A1", description="desc"))
 
     # Setear turno actual al host
-    host_player = db_session.query(Player).filter(Player.id == game.host_id).first()
+    host_player = db_session.scalar(select(Player).where(Player.id == game.host_id))
     game.current_turn = host_player.id
     db_session.commit()
 
@@ -234,117 +332,120 @@ def test_next_player_normal_flow(game_service, db_session):
     assert next_pid2 == host_player.id  # vuelve al host
 
 
-def test_are_all_other_secrets_revealed_returns_true(game_service, db_session):
-    """
-    Prueba que la función devuelve True cuando todos los secretos no-asesinos están revelados.
-    """
-    dto = GameInDTO(name="Test Reveal True", host_name="Host", birthday=date(2000, 1, 1), min_players=4, max_players=4)
+def test_next_player_follows_uuid_order_and_wraps(game_service, db_session):
+    dto = _game_dto(name="Turn Order", min_players=2, max_players=4)
     game_dto = game_service.create_game(dto)
-    for i in range(2, 5):
-        game_service.add_player(game_dto.id, PlayerInDTO(name=f"Player{i}", birthday=date(2000, 1, i)))
+    for player in _EXTRA_PLAYERS[:3]:
+        game_service.add_player(game_dto.id, player)
 
-    game_orm = db_session.query(Game).filter(Game.id == game_dto.id).first()
-    player_ids = [p.id for p in game_orm.players]
-    SecretService.create_secrets(db_session, game_orm.id, player_ids)
-    SecretService.deal_secrets(db_session, game_orm.id, player_ids)
+    ordered_ids = sorted(
+        db_session.scalars(select(Player.id).where(Player.game_id == game_dto.id))
+    )
+    game = db_session.get(Game, game_dto.id)
+    game.current_turn = ordered_ids[0]
+    db_session.commit()
 
-    secrets = db_session.query(Secrets).filter(Secrets.game_id == game_orm.id).all()
+    turns = [game_service.next_player(game.id) for _ in range(len(ordered_ids))]
+    assert turns == ordered_ids[1:] + ordered_ids[:1]
 
-    # Revelamos todos los secretos que no son del asesino
-    for secret in secrets:
-        if secret.role != SecretType.MURDERER:
-            secret.revealed = True
-    db_session.commit()
 
-    # La función debe devolver True
-    assert game_service.are_all_other_secrets_revealed(game_orm.id) is True
+def test_get_player_neighbors_uses_uuid_order(game_service, db_session):
+    dto = _game_dto(name="Neighbors", min_players=2, max_players=4)
+    game_dto = game_service.create_game(dto)
+    for player in _EXTRA_PLAYERS[:2]:
+        game_service.add_player(game_dto.id, player)
+
+    ordered_ids = sorted(
+        db_session.scalars(select(Player.id).where(Player.game_id == game_dto.id))
+    )
+    prev_player, next_player = game_service.get_player_neighbors(game_dto.id, ordered_ids[0])
+
+    assert prev_player.id == ordered_ids[-1]
+    assert next_player.id == ordered_ids[1]
+
 
-def test_are_all_other_secrets_revealed_returns_false(game_service, db_session):
+def _seed_players(db, game_id, n):
     """
-    Prueba que la función devuelve False si al menos un secreto no-asesino no está revelado.
+    Agrega n jugadores a la partida con un único INSERT (executemany) y un
+    commit, sin pasar por add_player. Para tests que solo necesitan la
+    partida ya poblada.
     """
-    dto = GameInDTO(name="Test Reveal False", host_name="Host", birthday=date(2000, 1, 1), min_players=4, max_players=4)
+    rows = [
+        {"id": uuid.uuid4(), "name": f"Player{i}", "birthday": date(2000, 1, i), "game_id": game_id}
+        for i in range(2, n + 2)
+    ]
+    db.execute(insert(Player), rows)
+    db.get(Game, game_id).player_count += n
+    db.commit()
+    return [row["id"] for row in rows]
+
+@pytest.fixture
+def five_player_game_with_secrets(game_service, db_session):
+    """Partida de 5 jugadores (hay cómplice) con los secretos ya repartidos."""
+    dto = _game_dto(name="Secrets Game", min_players=5, max_players=6)
     game_dto = game_service.create_game(dto)
-    for i in range(2, 5):
-        game_service.add_player(game_dto.id, PlayerInDTO(name=f"Player{i}", birthday=date(2000, 1, i)))
+    _seed_players(db_session, game_dto.id, 4)
 
-    game_orm = db_session.query(Game).filter(Game.id == game_dto.id).first()
+    game_orm = db_session.get(
+        Game, game_dto.id, options=[selectinload(Game.players)], populate_existing=True
+    )
     player_ids = [p.id for p in game_orm.players]
     SecretService.create_secrets(db_session, game_orm.id, player_ids)
     SecretService.deal_secrets(db_session, game_orm.id, player_ids)
 
-    # La función debe devolver True
-    assert game_service.are_all_other_secrets_revealed(game_orm.id) is False
+    secrets = db_session.query(Secrets).filter(Secrets.game_id == game_orm.id).all()
+    return game_orm, secrets, player_ids
 
-def test_end_game_murderers_win(game_service, db_session):
+@pytest.mark.parametrize("reveal_non_murderer", [True, False])
+def test_are_all_other_secrets_revealed(
+    game_service, db_session, five_player_game_with_secrets, reveal_non_murderer
+):
     """
-    Prueba el fin de juego cuando ganan los asesinos.
+    Devuelve True solo si todos los secretos que no son del asesino están revelados.
     """
-    dto = GameInDTO(name="Murderers Win Test", host_name="Host", birthday=date(2000, 1, 1), min_players=5, max_players=6)
-    game_dto = game_service.create_game(dto)
-    for i in range(2, 6):
-        game_service.add_player(game_dto.id, PlayerInDTO(name=f"Player{i}", birthday=date(2000, 1, i)))
+    game_orm, secrets, _ = five_player_game_with_secrets
 
-    game_orm = db_session.query(Game).filter(Game.id == game_dto.id).first()
-    player_ids = [p.id for p in game_orm.players]
-    SecretService.create_secrets(db_session, game_orm.id, player_ids)
-    SecretService.deal_secrets(db_session, game_orm.id, player_ids)
+    if reveal_non_murderer:
+        for secret in secrets:
+            if secret.role != SecretType.MURDERER:
+                secret.revealed = True
+        db_session.commit()
 
-    db_session.refresh(game_orm)
-    players = game_orm.players
-    secrets = db_session.query(Secrets).filter(Secrets.game_id == game_orm.id).all()
-    
-    murderer_id = next(s.owner_player_id for s in secrets if s.role == SecretType.MURDERER)
-    accomplice_id = next(s.owner_player_id for s in secrets if s.role == SecretType.ACCOMPLICE)
-    
-    result = game_service.end_game(game_orm.id, reason=GameEndReason.DECK_EMPTY)
-    
-    assert result.winning_team == WinningTeam.MURDERERS
-    assert len(result.winners) >= 1
-    assert murderer_id in [w.id for w in result.winners]
-    assert accomplice_id in [w.id for w in result.winners]
-    assert len(result.player_roles) == len(players)
+    assert game_service.are_all_other_secrets_revealed(game_orm.id) is reveal_non_murderer
 
-def test_end_game_detectives_win(game_service, db_session):
+@pytest.mark.parametrize("reason, expected_team, murderers_win", [
+    (GameEndReason.DECK_EMPTY, WinningTeam.MURDERERS, True),
+    (GameEndReason.MURDERER_REVEALED, WinningTeam.DETECTIVES, False),
+])
+def test_end_game_winners(
+    game_service, five_player_game_with_secrets, reason, expected_team, murderers_win
+):
     """
-    Prueba el fin de juego cuando ganan los detectives.
+    Prueba el fin de juego para cada equipo ganador.
     """
-    dto = GameInDTO(name="Detectives Win Test", host_name="Host", birthday=date(2000, 1, 1), min_players=5, max_players=6)
-    game_dto = game_service.create_game(dto)
-    for i in range(2, 6):
-        game_service.add_player(game_dto.id, PlayerInDTO(name=f"Player{i}", birthday=date(2000, 1, i)))
+    game_orm, secrets, player_ids = five_player_game_with_secrets
+    owner_by_role = {s.role: s.owner_player_id for s in secrets}
 
-    game_orm = db_session.query(Game).filter(Game.id == game_dto.id).first()
-    player_ids = [p.id for p in game_orm.players]
-    SecretService.create_secrets(db_session, game_orm.id, player_ids)
-    SecretService.deal_secrets(db_session, game_orm.id, player_ids)
+    result = game_service.end_game(game_orm.id, reason=reason)
 
-    db_session.refresh(game_orm)
-    players = game_orm.players
-    secrets = db_session.query(Secrets).filter(Secrets.game_id == game_orm.id).all()
-    
-    murderer_id = next(s.owner_player_id for s in secrets if s.role == SecretType.MURDERER)
-    accomplice_id = next(s.owner_player_id for s in secrets if s.role == SecretType.ACCOMPLICE)
-    
-    result = game_service.end_game(game_orm.id, reason=GameEndReason.MURDERER_REVEALED)
-    
-    assert result.winning_team == WinningTeam.DETECTIVES
-    assert len(result.winners) >= 1
-    assert murderer_id not in [w.id for w in result.winners]
-    assert accomplice_id not in [w.id for w in result.winners]
-    assert len(result.player_roles) == len(players)
+    winner_ids = {w.id for w in result.winners}
+    assert result.winning_team == expected_team
+    assert len(winner_ids) >= 1
+    assert (owner_by_role[SecretType.MURDERER] in winner_ids) is murderers_win
+    assert (owner_by_role[SecretType.ACCOMPLICE] in winner_ids) is murderers_win
+    assert len(result.player_roles) == len(player_ids)
 
 # --- Tests para get_turn_state() ---
 def test_get_turn_state_success(game_service, db_session):
     """Debe devolver el estado y target_player_id correctamente."""
-    game = Game(name="TurnStateTest", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="TurnStateTest", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
-    db_session.commit()
+    db_session.flush()
 
     state = GameTurnState(
         game_id=game.id,
         state=TurnState.DRAWING_CARDS,
-        target_player_id=uuid.uuid4()
+        target_player_id=next(uids)
     )
     db_session.add(state)
     db_session.commit()
@@ -358,7 +459,7 @@ def test_get_turn_state_success(game_service, db_session):
 
 def test_get_turn_state_not_exists_raises(game_service, db_session):
     """Debe lanzar ValueError si no existe estado de turno para el juego."""
-    game = Game(name="TurnStateMissing", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="TurnStateMissing", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
     db_session.commit()
 
@@ -369,14 +470,12 @@ def test_get_turn_state_not_exists_raises(game_service, db_session):
 # --- Tests para change_turn_state() ---
 def test_change_turn_state_success_normal(game_service, db_session):
     """Debe cambiar correctamente el estado de turno sin target_player_id."""
-    game = Game(name="ChangeTurn", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="ChangeTurn", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
-    db_session.commit()
+    db_session.flush()
 
     turn_state = GameTurnState(game_id=game.id, state=TurnState.IDLE)
     db_session.add(turn_state)
-    db_session.commit()
-
     game.turn_state = turn_state
     db_session.commit()
 
@@ -389,18 +488,16 @@ def test_change_turn_state_success_normal(game_service, db_session):
 
 def test_change_turn_state_to_choosing_secret_sets_target(game_service, db_session):
     """Debe setear target_player_id cuando el estado es CHOOSING_SECRET."""
-    game = Game(name="ChangeTurnSecret", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="ChangeTurnSecret", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
-    db_session.commit()
+    db_session.flush()
 
     turn_state = GameTurnState(game_id=game.id, state=TurnState.IDLE)
     db_session.add(turn_state)
-    db_session.commit()
-
     game.turn_state = turn_state
     db_session.commit()
 
-    target_id = uuid.uuid4()
+    target_id = next(uids)
     game_service.change_turn_state(game.id, TurnState.CHOOSING_SECRET, target_id)
 
     updated = db_session.query(GameTurnState).filter_by(game_id=game.id).first()
@@ -410,14 +507,14 @@ def test_change_turn_state_to_choosing_secret_sets_target(game_service, db_sessi
 
 def test_change_turn_state_missing_game_raises(game_service):
     """Debe lanzar ValueError si el juego no existe."""
-    fake_game = uuid.uuid4()
+    fake_game = next(uids)
     with pytest.raises(ValueError, match = "Juego no encontrado"):
         game_service.change_turn_state(fake_game, TurnState.DRAWING_CARDS)
 
 
 def test_change_turn_state_missing_turn_state_raises(game_service, db_session):
     """Debe lanzar ValueError si el juego no tiene objeto turn_state."""
-    game = Game(name="NoTurnState", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="NoTurnState", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
     db_session.commit()
 
@@ -427,52 +524,34 @@ def test_change_turn_state_missing_turn_state_raises(game_service, db_session):
 
 def test_change_turn_state_choosing_secret_without_target_raises(game_service, db_session):
     """Debe lanzar ValueError si CHOOSING_SECRET no tiene target_player_id."""
-    game = Game(name="NoTargetSecret", host_id=uuid.uuid4(), min_players=2, max_players=4)
+    game = Game(name="NoTargetSecret", host_id=next(uids), min_players=2, max_players=4)
     db_session.add(game)
-    db_session.commit()
+    db_session.flush()
 
     turn_state = GameTurnState(game_id=game.id, state=TurnState.IDLE)
     db_session.add(turn_state)
-    db_session.commit()
-
     game.turn_state = turn_state
     db_session.commit()
 
     with pytest.raises(ValueError):
         game_service.change_turn_state(game.id, TurnState.CHOOSING_SECRET)
 
-@pytest.mark.asyncio
-async def test_handler_end_timer_normal_state_triggers_expected_calls(db_session):
+def test_handler_end_timer_normal_state_triggers_expected_calls(mocker):
     """Debe ejecutar el flujo normal: handle_end_timer_normal_state, change_turn_state, next_player y broadcast."""
     from app.game.service import GameService
 
     # --- Setup ---
-    game_service = GameService(db_session)
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
-
-    # Estado inicial simulado del turno
-    state = MagicMock()
-    state.state = TurnState.END_TURN
-
-    # Crear objeto Game real en la base de prueba
-    db_session.add(
-        Game(
-            id=game_id,
-            name="TimerTest",
-            host_id=player_id,
-            min_players=2,
-            max_players=4,
-            current_turn=player_id
-        )
-    )
-    db_session.commit()
+    # Toda la interacción con la DB está mockeada: no hace falta sqlite
+    fake_db = MagicMock()
+    game_service = GameService(fake_db)
+    game_id = next(uids)
+    player_id = next(uids)
 
     # Mockear métodos internos del servicio
     game_service.get_turn_state = MagicMock(
         return_value=GameTurnStateOut(turn_state=TurnState.DRAWING_CARDS, target_player_id=None)
     )
-    fake_next_player = uuid.uuid4()
+    fake_next_player = next(uids)
     game_service.handle_end_timer_normal_state = MagicMock()
     game_service.change_turn_state = MagicMock()
     game_service.next_player = MagicMock(return_value=fake_next_player)
@@ -481,52 +560,38 @@ async def test_handler_end_timer_normal_state_triggers_expected_calls(db_session
     mock_game = MagicMock()
     mock_game.turn_state.state = TurnState.IDLE
     mock_game.current_turn=player_id
+    fake_db.query.return_value.filter.return_value.first.return_value = mock_game
 
     fake_manager = AsyncMock()
 
+    mocker.patch("app.game.service.manager", fake_manager)
+
     # --- Act ---
-    # Parchear la query para que devuelva el mock_game
-    with (
-        patch.object(game_service.db, "query") as mock_query,
-        patch("app.game.service.manager", fake_manager)
-    ):
-        mock_query.return_value.filter.return_value.first.return_value = mock_game
-        await game_service.handler_end_timer(game_id)
+    asyncio.run(game_service.handler_end_timer(game_id))
 
     # --- Assert ---
     game_service.handle_end_timer_normal_state.assert_called_once()
     game_service.change_turn_state.assert_called_once_with(game_id, TurnState.END_TURN)
     game_service.next_player.assert_called_once_with(game_id)
-    fake_manager.broadcast_to_game.assert_any_call(
-    game_id,
-    {
-        "type": "endTimer",
-        "data": {
-            "player_id": str(player_id)
-        },
-    },
-    )
-    fake_manager.broadcast_to_game.assert_any_call(
+    fake_manager.broadcast_to_game.assert_called_once_with(
         game_id,
         {
-            "type": "turnChange",
+            "type": "turnTransition",
             "data": {
-                "player_id": str(fake_next_player)
+                "ended": str(player_id),
+                "next": str(fake_next_player)
             },
         },
     )
 
 
-@pytest.mark.asyncio
-async def test_handler_end_timer_when_game_ends_broadcasts_gameEnded(db_session):
+def test_handler_end_timer_when_game_ends_broadcasts_gameEnded(mocker):
     """Debe detectar EndGameResult y enviar broadcast con gameEnded."""
     from app.game.service import GameService
 
-    game_service = GameService(db_session)
-    game_id = uuid.uuid4()
-
-    db_session.add(Game(id=game_id, name="EndGameTimer", host_id=uuid.uuid4(), min_players=2, max_players=4))
-    db_session.commit()
+    fake_db = MagicMock()
+    game_service = GameService(fake_db)
+    game_id = next(uids)
 
     game_service.get_turn_state = MagicMock(
         return_value=GameTurnStateOut(turn_state=TurnState.IDLE, target_player_id=None)
@@ -541,33 +606,31 @@ async def test_handler_end_timer_when_game_ends_broadcasts_gameEnded(db_session)
 
     mock_game = MagicMock()
     mock_game.turn_state.state = TurnState.IDLE
+    fake_db.query.return_value.filter.return_value.first.return_value = mock_game
 
     fake_manager = AsyncMock()
-    with (
-        patch.object(game_service.db, "query") as mock_query,
-        patch("app.game.service.manager", fake_manager)
-    ):
-        mock_query.return_value.filter.return_value.first.return_value = mock_game
-        await game_service.handler_end_timer(game_id)
+    mocker.patch("app.game.service.manager", fake_manager)
+    asyncio.run(game_service.handler_end_timer(game_id))
 
     fake_manager.broadcast_to_game.assert_any_call(
         game_id, {"type": "gameEnded", "data": ANY}
     )
 
 
-def test_handle_end_timer_normal_state_player_with_6_cards(monkeypatch, db_session):
+def test_handle_end_timer_normal_state_player_with_6_cards(monkeypatch):
     """Si el jugador tiene 6 cartas, debe descartar una y robar una nueva."""
     from app.game.service import GameService
     from app.card.enums import CardOwner
     from app.card.schemas import CardMoveIn
 
-    game_service = GameService(db_session)
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
+    fake_db = MagicMock()
+    game_service = GameService(fake_db)
+    game_id = next(uids)
+    player_id = next(uids)
 
     # Mocks
     monkeypatch.setattr("app.game.service.CardService.count_player_hand", MagicMock(return_value=6))
-    fake_cards = [MagicMock(id=uuid.uuid4())]
+    fake_cards = [MagicMock(id=next(uids))]
     monkeypatch.setattr("app.game.service.CardService.get_cards_by_owner", MagicMock(return_value=fake_cards))
     monkeypatch.setattr("app.game.service.CardService.move_card", MagicMock())
     monkeypatch.setattr("app.game.service.CardService.moveDeckToPlayer", MagicMock())
@@ -575,20 +638,21 @@ def test_handle_end_timer_normal_state_player_with_6_cards(monkeypatch, db_sessi
     game_service.handle_end_timer_normal_state(game_id, player_id)
 
     CardService = __import__("app.card.service", fromlist=["CardService"]).CardService
-    CardService.count_player_hand.assert_called_once_with(db_session, game_id, player_id)
-    CardService.get_cards_by_owner.assert_called_once_with(db_session, game_id, CardOwner.PLAYER, player_id)
+    CardService.count_player_hand.assert_called_once_with(fake_db, game_id, player_id)
+    CardService.get_cards_by_owner.assert_called_once_with(fake_db, game_id, CardOwner.PLAYER, player_id)
     CardService.move_card.assert_called_once()
-    CardService.moveDeckToPlayer.assert_called_once_with(db_session, game_id, player_id, 1)
+    CardService.moveDeckToPlayer.assert_called_once_with(fake_db, game_id, player_id, 1)
 
 
-def test_handle_end_timer_normal_state_player_with_less_than_6(monkeypatch, db_session):
+def test_handle_end_timer_normal_state_player_with_less_than_6(monkeypatch):
     """Si el jugador tiene menos de 6 cartas, debe robar la diferencia."""
     from app.game.service import GameService
     from app.card.enums import CardOwner
 
-    game_service = GameService(db_session)
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
+    fake_db = MagicMock()
+    game_service = GameService(fake_db)
+    game_id = next(uids)
+    player_id = next(uids)
 
     # Mock CardService
     monkeypatch.setattr("app.game.service.CardService.count_player_hand", MagicMock(return_value=3))
@@ -597,7 +661,7 @@ def test_handle_end_timer_normal_state_player_with_less_than_6(monkeypatch, db_s
     game_service.handle_end_timer_normal_state(game_id, player_id)
 
     CardService = __import__("app.card.service", fromlist=["CardService"]).CardService
-    CardService.moveDeckToPlayer.assert_called_once_with(db_session, game_id, player_id, 3)
+    CardService.moveDeckToPlayer.assert_called_once_with(fake_db, game_id, player_id, 3)
 @pytest.mark.parametrize("num_players, expected_deck_name", [
     (2, "deck2p.json"),
     (3, "deck.json"),
@@ -609,76 +673,44 @@ def test_start_game_loads_correct_deck_file(
     game_service, db_session, num_players, expected_deck_name, monkeypatch
 ):
     """
-    Verifica que start_game intenta cargar el archivo JSON correcto
+    Verifica que start_game usa el mazo precargado correcto
     (deck2p.json o deck.json) según el número de jugadores,
     mockeando las dependencias externas.
     """
     # 1. Arrange: Crear juego y añadir jugadores
-    dto = GameInDTO(
-        name=f"Deck Test {num_players}p",
-        host_name=str(uuid.uuid4()),
-        birthday=date(2000,1,1),
-        min_players=num_players,
-        max_players=6
-    )
+    dto = _game_dto(name=f"Deck Test {num_players}p", min_players=num_players, max_players=6)
     game_dto = game_service.create_game(dto)
 
-    for i in range(1, num_players):
-        game_service.add_player(game_dto.id, PlayerInDTO(name=f"Player{i+1}", birthday=date(2001, i, i)))
+    _seed_players(db_session, game_dto.id, num_players - 1)
 
-    game_db_obj = db_session.query(Game).filter(Game.id == game_dto.id).first()
+    game_db_obj = db_session.get(
+        Game, game_dto.id, options=[selectinload(Game.players)], populate_existing=True
+    )
     assert game_db_obj is not None, "El juego no se creó correctamente en la DB"
-    db_session.refresh(game_db_obj)
     assert len(game_db_obj.players) == num_players, f"Se esperaban {num_players} jugadores, pero se encontraron {len(game_db_obj.players)}"
 
-    mock_file_dict = {"items": [{"type": "EVENT", "name": "Test Card", "description": "Desc"}]}
-    mock_file_content = json.dumps(mock_file_dict)
-    mock_loader = mock_open(read_data=mock_file_content)
-
     mock_create_cards = MagicMock(return_value=[])
     mock_shuffle = MagicMock()
-    mock_players_list = [MagicMock(id=uuid.uuid4()) for _ in range(num_players)]
-    mock_get_players = MagicMock(return_value=mock_players_list)
     mock_deal_cards = MagicMock()
     mock_initialize_draft = MagicMock(return_value=[])
     mock_create_secrets = MagicMock(return_value=[]) 
     mock_deal_secrets = MagicMock(return_value={}) 
 
-    mock_first_player = MagicMock(return_value=game_dto.host_id)
-
-    opened_path = None
-    def spy_open(self, *args, **kwargs):
-        nonlocal opened_path
-        opened_path = self.name
-        return mock_loader(self, *args, **kwargs)
-
-    expected_payload_obj = CardBatchIn(
-        items=[CardIn(**item) for item in mock_file_dict["items"]]
-    )
-
     with monkeypatch.context() as m:
-        m.setattr(Path, "open", spy_open)
-        m.setattr("json.load", lambda f: mock_file_dict)
+        m.setattr(CardService, "create_cards_batch", mock_create_cards)
+        m.setattr(CardService, "shuffle_deck", mock_shuffle)
+        m.setattr(CardService, "deal_cards", mock_deal_cards)
+        m.setattr(CardService, "initialize_draft", mock_initialize_draft)
 
-        m.setattr(game_service, "first_player", mock_first_player)
-
-        m.setattr("app.game.service.CardService.create_cards_batch", mock_create_cards)
-        m.setattr("app.game.service.CardService.shuffle_deck", mock_shuffle)
-        m.setattr("app.game.service.CardService.deal_cards", mock_deal_cards)
-        m.setattr("app.game.service.CardService.initialize_draft", mock_initialize_draft)
-
-        m.setattr("app.game.service.PlayerService", lambda db: MagicMock(get_players_by_game_id=mock_get_players))
-
-        m.setattr("app.game.service.SecretService.create_secrets", mock_create_secrets)
-        m.setattr("app.game.service.SecretService.deal_secrets", mock_deal_secrets)
+        m.setattr(SecretService, "create_secrets", mock_create_secrets)
+        m.setattr(SecretService, "deal_secrets", mock_deal_secrets)
 
 
         result = game_service.start_game(game_dto.id)
 
     assert result is True, f"start_game devolvió False. Player count: {len(game_db_obj.players)}, min_players: {game_db_obj.min_players}"
-    assert opened_path == expected_deck_name, f"Se esperaba abrir '{expected_deck_name}' pero se abrió '{opened_path}'"
 
-    mock_first_player.assert_called_once_with(game_dto.id)
+    assert game_db_obj.current_turn in {p.id for p in game_db_obj.players}
     mock_create_cards.assert_called_once()
     call_args_tuple = mock_create_cards.call_args[0]
     assert len(call_args_tuple) == 3, "create_cards_batch fue llamado con un número incorrecto de argumentos"
@@ -686,43 +718,43 @@ def test_start_game_loads_correct_deck_file(
 
     actual_payload_obj = call_args_tuple[2]
     assert isinstance(actual_payload_obj, CardBatchIn), "El payload no es una instancia de CardBatchIn"
-    assert len(actual_payload_obj.items) == len(expected_payload_obj.items), "El número de items en el payload no coincide"
-    assert actual_payload_obj.items[0].name == expected_payload_obj.items[0].name, "El contenido del payload no coincide"
+    assert actual_payload_obj is _CARD_BATCHES[expected_deck_name], f"Se esperaba usar el mazo '{expected_deck_name}'"
 
     mock_shuffle.assert_called_once()
-    mock_get_players.assert_called_once()
     mock_deal_cards.assert_called_once()
+    assert set(mock_deal_cards.call_args[0][2]) == {p.id for p in game_db_obj.players}
     mock_initialize_draft.assert_called_once()
     mock_create_secrets.assert_called_once()
     mock_deal_secrets.assert_called_once()
 
 
 @pytest.fixture
-def game_with_state(game_service, db_session):
+def game_with_state(request, game_service, db_session):
     """
     Crea un juego, jugadores (p1, p2), y un objeto GameTurnState inicializado en IDLE.
+    Con parametrización indirecta se puede pedir otro estado inicial:
+    {"state": ..., "vote_data": ...}, donde vote_data puede ser un callable
+    que recibe (p1_id, p2_id). Todo queda guardado con un único commit.
     """
-    dto = GameInDTO(
-        name="Test Game PYS",
-        host_name="Player 1",
-        birthday=date(2000,1,1),
-        min_players=2,
-        max_players=4
-    )
+    dto = _game_dto(name="Test Game PYS", host_name="Player 1", min_players=2, max_players=4)
     game_dto = game_service.create_game(dto)
     p2_id = game_service.add_player(game_dto.id, PlayerInDTO(name="Player 2", birthday=date(2001,1,1)))
     
-    game = db_session.query(Game).filter(Game.id == game_dto.id).first()
-    
+    game = db_session.get(Game, game_dto.id)
+
+    init_state = getattr(request, "param", None) or {}
+    vote_data = init_state.get("vote_data")
+    if callable(vote_data):
+        vote_data = vote_data(game.host_id, p2_id)
+
     turn_state = GameTurnState(
         game_id=game.id,
-        state=TurnState.IDLE,
-        vote_data=None
+        state=init_state.get("state", TurnState.IDLE),
+        vote_data=vote_data
     )
     db_session.add(turn_state)
     game.turn_state = turn_state
     db_session.commit()
-    db_session.refresh(turn_state)
     
     return {
         "game_service": game_service,
@@ -730,6 +762,9 @@ def game_with_state(game_service, db_session):
         "game_id": game.id,
         "p1_id": game.host_id,
         "p2_id": p2_id,
+        # Los ids como string, tal como se guardan en vote_data / sfp_players
+        "p1_id_s": str(game.host_id),
+        "p2_id_s": str(p2_id),
         "turn_state_obj": turn_state
     }
 
@@ -743,7 +778,7 @@ def test_change_turn_state_to_voting_initializes_vote_data(game_with_state):
     game_service = game_with_state["game_service"]
     game_id = game_with_state["game_id"]
     turn_state_obj = game_with_state["turn_state_obj"]
-    fake_event_card_id = uuid.uuid4()
+    fake_event_card_id = next(uids)
 
     # Poner en VOTING
     game_service.change_turn_state(
@@ -765,6 +800,9 @@ def test_change_turn_state_to_voting_initializes_vote_data(game_with_state):
 
 # --- Tests para submit_player_vote (Lógica de guardar votos) ---
 
+@pytest.mark.parametrize(
+    "game_with_state", [{"state": TurnState.VOTING, "vote_data": {}}], indirect=True
+)
 def test_submit_player_vote_happy_path(game_with_state):
     """Prueba que un voto válido se guarda correctamente en el JSON."""
     game_service = game_with_state["game_service"]
@@ -773,187 +811,105 @@ def test_submit_player_vote_happy_path(game_with_state):
     p2_id = game_with_state["p2_id"]
     turn_state_obj = game_with_state["turn_state_obj"]
 
-    turn_state_obj.state = TurnState.VOTING
-    turn_state_obj.vote_data = {}
-    game_with_state["db"].commit()
-
     game_service.submit_player_vote(game_id, p1_id, p2_id)
 
     game_with_state["db"].refresh(turn_state_obj)
-    assert turn_state_obj.vote_data == {str(p1_id): str(p2_id)}
+    assert turn_state_obj.vote_data == {game_with_state["p1_id_s"]: game_with_state["p2_id_s"]}
 
-def test_submit_player_vote_error_wrong_state(game_with_state):
-    """Falla si el estado del juego no es VOTING."""
-    game_service = game_with_state["game_service"]
-    game_id = game_with_state["game_id"]
-    p1_id = game_with_state["p1_id"]
-    p2_id = game_with_state["p2_id"]
-    
-    with pytest.raises(HTTPException, match="Not in a voting phase"):
-        game_service.submit_player_vote(game_id, p1_id, p2_id)
+def _service_with_turn_state(state):
+    """GameService sobre una sesión falsa cuyo GameTurnState ya está armado."""
+    fake_db = MagicMock()
+    turn_state = GameTurnState(game_id=next(uids), state=state, vote_data={})
+    fake_db.query.return_value.filter.return_value.first.return_value = turn_state
+    return GameService(fake_db), fake_db
 
-def test_submit_player_vote_error_vote_self(game_with_state):
-    """Falla si un jugador intenta votarse a sí mismo."""
-    game_service = game_with_state["game_service"]
-    game_id = game_with_state["game_id"]
-    p1_id = game_with_state["p1_id"]
-    game_with_state["turn_state_obj"].state = TurnState.VOTING
-    game_with_state["db"].commit()
+def test_submit_player_vote_error_wrong_state():
+    """Falla si el estado del juego no es VOTING."""
+    game_service, fake_db = _service_with_turn_state(TurnState.DISCARDING)
 
-    with pytest.raises(HTTPException, match="Cannot vote for oneself"):
-        game_service.submit_player_vote(game_id, p1_id, p1_id)
+    with pytest.raises(HTTPException, match=_ERR_NOT_VOTING):
+        game_service.submit_player_vote(next(uids), next(uids), next(uids))
+    fake_db.commit.assert_not_called()
 
+def test_submit_player_vote_error_vote_self():
+    """Falla si un jugador intenta votarse a sí mismo."""
+    game_service, fake_db = _service_with_turn_state(TurnState.VOTING)
+    p1_id = next(uids)
+
+    with pytest.raises(HTTPException, match=_ERR_SELF_VOTE):
+        game_service.submit_player_vote(next(uids), p1_id, p1_id)
+    fake_db.commit.assert_not_called()
+
+@pytest.mark.parametrize(
+    "game_with_state",
+    # Forzamos el estado y un voto existente: p1 ya votó a p2
+    [{"state": TurnState.VOTING, "vote_data": lambda p1, p2: {str(p1): str(p2)}}],
+    indirect=True,
+)
 def test_submit_player_vote_error_vote_twice(game_with_state):
     """Falla si un jugador intenta votar por segunda vez."""
     game_service = game_with_state["game_service"]
     game_id = game_with_state["game_id"]
     p1_id = game_with_state["p1_id"]
     p2_id = game_with_state["p2_id"]
-    
-    # Forzamos el estado y un voto existente
-    turn_state_obj = game_with_state["turn_state_obj"]
-    turn_state_obj.state = TurnState.VOTING
-    turn_state_obj.vote_data = {str(p1_id): str(p2_id)} # p1 ya votó
-    game_with_state["db"].commit()
-
-    with patch("app.game.service.flag_modified"):
-        with pytest.raises(HTTPException, match="Player has already voted"):
-            game_service.submit_player_vote(game_id, p1_id, p2_id) # p1 intenta votar de nuevo
-def test_remove_player_not_host(db_session):
-    """
-    Prueba que un jugador (que NO es el host) es eliminado 
-    correctamente de una partida no iniciada.
-    """
-    game_service = GameService(db_session)
-    
-    # Crear jugadores
-    host = Player(name="Host Player", birthday=date(2000, 1, 1))
-    player2 = Player(name="Player 2", birthday=date(2001, 1, 1))
-    db_session.add_all([host, player2])
-    db_session.commit()
-
-    # Crear partida
-    game = Game(
-        name="Test Game", 
-        host_id=host.id, 
-        min_players=2, 
-        max_players=4,
-        ready=False # La partida NO ha comenzado
-    )
-    db_session.add(game)
-    db_session.commit()
-
-    # Vincular jugadores a la partida
-    host.game_id = game.id
-    player2.game_id = game.id
-    db_session.commit()
-    
-    game_id = game.id
-    player2_id = player2.id
-    
-    # Verificar estado inicial
-    game_db = db_session.query(Game).filter(Game.id == game_id).one()
-    assert len(game_db.players) == 2
-
-    success = game_service.remove_player(game_id, player2_id)
-
-    assert success 
-    
-    # Refrescar la sesión para ver los cambios
-    db_session.refresh(game_db)
-    
-    # El juego debe seguir existiendo
-    assert db_session.query(Game).count() == 1
-    
-    # El jugador 2 debe haber sido eliminado
-    assert db_session.query(Player).filter(Player.id == player2_id).first() is None
-    
-    # El juego ahora solo debe tener 1 jugador (el host)
-    assert len(game_db.players) == 1
-    assert game_db.players[0].id == host.id
 
-
-def test_remove_player_is_host(db_session):
+    with pytest.raises(HTTPException, match=_ERR_TWICE):
+        game_service.submit_player_vote(game_id, p1_id, p2_id) # p1 intenta votar de nuevo
+@pytest.fixture
+def make_game(db_session):
     """
-    Prueba que si el HOST es eliminado, la partida completa 
-    es eliminada (gracias a cascade="all, delete-orphan").
+    Fábrica de partidas sin pasar por el servicio: host + jugadores extra
+    vinculados a la partida, todo con un único commit.
     """
-    game_service = GameService(db_session)
-    
-    host = Player(name="Host Player", birthday=date(2000, 1, 1))
-    player2 = Player(name="Player 2", birthday=date(2001, 1, 1))
-    db_session.add_all([host, player2])
-    db_session.commit()
-
-    game = Game(
-        name="Test Game", 
-        host_id=host.id, 
-        min_players=2, 
-        max_players=4,
-        ready=False
-    )
-    db_session.add(game)
-    db_session.commit()
-
-    host.game_id = game.id
-    player2.game_id = game.id
-    db_session.commit()
-    
-    game_id = game.id
-    host_id = host.id
-    player2_id = player2.id
-
-    # Verificar estado inicial
-    assert db_session.query(Game).count() == 1
-    assert db_session.query(Player).count() == 2
-
-    success = game_service.remove_player(game_id, host_id)
-
-    assert success is True
-    
-    # El juego debe haber sido eliminado
-    assert db_session.query(Game).filter(Game.id == game_id).first() is None
-    
-    # Los jugadores también deben ser eliminados (por cascade)
-    assert db_session.query(Player).filter(Player.id == host_id).first() is None
-    assert db_session.query(Player).filter(Player.id == player2_id).first() is None
-
-
-def test_remove_player_fails_if_game_started(db_session):
+    def _make(ready=False, n_players=2):
+        host = Player(id=uuid.uuid4(), name="Host Player", birthday=date(2000, 1, 1))
+        extras = [
+            Player(id=uuid.uuid4(), name=f"Player {i}", birthday=date(2001, 1, 1))
+            for i in range(2, n_players + 1)
+        ]
+        game = Game(
+            id=uuid.uuid4(),
+            name="Test Game",
+            host_id=host.id,
+            min_players=2,
+            max_players=4,
+            ready=ready,
+            player_count=n_players,
+        )
+        for player in (host, *extras):
+            player.game_id = game.id
+        db_session.add_all([game, host, *extras])
+        db_session.commit()
+        return game, host, extras
+    return _make
+
+@pytest.mark.parametrize("ready, remove, expected_success, expected_games, expected_players", [
+    # Un jugador (no host) deja una partida no iniciada
+    (False, "player", True, 1, 1),
+    # Si se va el host se elimina la partida completa (cascade="all, delete-orphan")
+    (False, "host", True, 0, 0),
+    # Con la partida iniciada nadie puede salir
+    (True, "player", False, 1, 2),
+    (True, "host", False, 1, 2),
+])
+def test_remove_player(
+    game_service, db_session, make_game, ready, remove, expected_success, expected_games, expected_players
+):
     """
-    Prueba que la función falla (devuelve False) si la partida 
-    ya ha comenzado (game.ready == True).
+    Prueba remove_player según quién sale y si la partida ya comenzó.
     """
-    game_service = GameService(db_session)
-    
-    host = Player(name="Host Player", birthday=date(2000, 1, 1))
-    player2 = Player(name="Player 2", birthday=date(2001, 1, 1))
-    db_session.add_all([host, player2])
-    db_session.commit()
+    game, host, (player2,) = make_game(ready=ready)
+    target_id = host.id if remove == "host" else player2.id
 
-    game = Game(
-        name="Test Game", 
-        host_id=host.id, 
-        min_players=2, 
-        max_players=4,
-        ready=True  # <-- Partida INICIADA
-    )
-    db_session.add(game)
-    db_session.commit()
+    assert game_service.remove_player(game.id, target_id) is expected_success
 
-    host.game_id = game.id
-    player2.game_id = game.id
-    db_session.commit()
-    
-    success_player = game_service.remove_player(game.id, player2.id)
-    success_host = game_service.remove_player(game.id, host.id)
-
-    assert success_player is False
-    assert success_host is False
-    
-    # Verificar que nada cambió
-    assert db_session.query(Game).count() == 1
-    assert db_session.query(Player).count() == 2
+    assert db_session.scalar(select(func.count()).select_from(Game)) == expected_games
+    # Cada test corre en su propia transacción: solo están los jugadores de esta partida
+    remaining_ids = db_session.scalars(select(Player.id)).all()
+    assert len(remaining_ids) == expected_players
+    if expected_players == 1:
+        # Solo queda el host
+        assert remaining_ids == [host.id]
 
 def test_change_turn_state_to_pending_devious_appends_player(game_with_state):
     """
@@ -964,6 +920,8 @@ def test_change_turn_state_to_pending_devious_appends_player(game_with_state):
     turn_state_obj = game_with_state["turn_state_obj"]
     p1_id = game_with_state["p1_id"]
     p2_id = game_with_state["p2_id"]
+    p1_id_s = game_with_state["p1_id_s"]
+    p2_id_s = game_with_state["p2_id_s"]
 
     db = game_with_state["db"]
 
@@ -975,7 +933,7 @@ def test_change_turn_state_to_pending_devious_appends_player(game_with_state):
     
     db.refresh(turn_state_obj)
     assert turn_state_obj.state == TurnState.PENDING_DEVIOUS
-    assert turn_state_obj.sfp_players == [str(p1_id)]
+    assert turn_state_obj.sfp_players == [p1_id_s]
 
     game_service.change_turn_state(
         game_id, 
@@ -984,7 +942,7 @@ def test_change_turn_state_to_pending_devious_appends_player(game_with_state):
     )
     
     db.refresh(turn_state_obj)
-    assert turn_state_obj.sfp_players == [str(p1_id), str(p2_id)]
+    assert turn_state_obj.sfp_players == [p1_id_s, p2_id_s]
 
 def test_change_turn_state_to_discarding_clears_sfp_players(game_with_state):
     """
@@ -994,15 +952,15 @@ def test_change_turn_state_to_discarding_clears_sfp_players(game_with_state):
     game_service = game_with_state["game_service"]
     game_id = game_with_state["game_id"]
     turn_state_obj = game_with_state["turn_state_obj"]
-    p1_id = game_with_state["p1_id"]
+    p1_id_s = game_with_state["p1_id_s"]
 
     db = game_with_state["db"]
 
     turn_state_obj.state = TurnState.PENDING_DEVIOUS
-    turn_state_obj.sfp_players = [str(p1_id)]
+    turn_state_obj.sfp_players = [p1_id_s]
     game_with_state["db"].commit()
     
-    assert turn_state_obj.sfp_players == [str(p1_id)]
+    assert turn_state_obj.sfp_players == [p1_id_s]
 
     game_service.change_turn_state(game_id, TurnState.DISCARDING)
     
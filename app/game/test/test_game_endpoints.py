@@ -1,441 +1,365 @@
+import json
 import types
 import pytest
-from unittest.mock import MagicMock, AsyncMock
-from fastapi.testclient import TestClient
-from app.game.enums import GameEndReason, WinningTeam, PlayerRole
+from unittest.mock import MagicMock
+import httpx
+import pytest_asyncio
+from app.game.enums import GameEndReason, WinningTeam, TurnState
 from app.game.schemas import EndGameResult
-from app.game.enums import TurnState
-from app.game.endpoints import remove_password
+from app.game.service import GameService
+from app.game import endpoints
+from app.game.endpoints import remove_password, turn_timer_manager
 
 from app.main import app
+from app.db import get_db
 from app.game.dtos import GameOutDTO
+from app.game.test import uids
 
 import uuid
 
-client = TestClient(app)
+# Resultado de fin de partida que el servicio simula devolver; es constante
+_FAKE_END_RESULT = EndGameResult(
+    reason=GameEndReason.DECK_EMPTY,
+    winning_team=WinningTeam.MURDERERS,
+    winners=[],
+    player_roles=[]
+)
+
+# Partida base armada una sola vez; make_game copia y pisa solo lo que cambia
+_TEMPLATE_GAME = GameOutDTO.model_construct(
+    id=uuid.UUID(int=0),
+    name="Test Game",
+    host_id=uuid.UUID(int=0),
+    min_players=2,
+    max_players=4,
+    ready=False,
+    players_ids=[],
+)
+
+# Cuerpos JSON serializados una sola vez al importar
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ADD_PLAYER_BODY = json.dumps({"name": "Alice", "birthday": "2000-01-01"}).encode()
+_CREATE_GAME_BODY = json.dumps({
+    "name": "New Game",
+    "host_name": "Host",
+    "birthday": "1990-01-01",
+    "min_players": 2,
+    "max_players": 4,
+}).encode()
+
+
+class DummyGameService:
+    """
+    GameService falso: cada método configurado devuelve (o lanza) su valor
+    y registra la llamada en `calls`. Los métodos no configurados no existen,
+    y solo se aceptan nombres que GameService realmente define.
+    """
+    def __init__(self, **results):
+        unknown = set(results).difference(dir(GameService))
+        if unknown:
+            raise AttributeError(f"GameService no define {sorted(unknown)}")
+        self.results = results
+        self.calls = []
 
+    def __getattr__(self, name):
+        if name not in self.results:
+            raise AttributeError(name)
 
-@pytest.fixture(autouse=True)
-def fake_db_dependency(monkeypatch):
-    """Avoid hitting the real database in endpoint tests."""
-    def fake_get_db():
-        yield object()
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            result = self.results[name]
+            if isinstance(result, Exception):
+                raise result
+            return result
 
-    monkeypatch.setattr("app.game.endpoints.get_db", fake_get_db)
+        return method
 
 
-def make_game(
-    game_id=None,
-    players=None,
-    max_players=4,
-    ready=False,
-):
-    game_id = game_id or uuid.uuid4()
-    players = players or []
-    return GameOutDTO(
-        id=game_id,
-        name="Test Game",
-        host_id=uuid.uuid4(),
-        min_players=2,
-        max_players=max_players,
-        ready=ready,
-        players_ids=players,
-    )
+class DummyManager:
+    """Manager de websockets de partida que acumula los broadcasts."""
+    __slots__ = ("calls",)
+    def __init__(self): self.calls = []
+    async def broadcast_to_game(self, gid, payload): self.calls.append((gid, payload))
+
+
+class DummyMenuManager:
+    """Manager de websockets del lobby que acumula los mensajes."""
+    __slots__ = ("messages",)
+    def __init__(self): self.messages = []
+    async def broadcast(self, message): self.messages.append(message)
 
 
-def test_list_games_default(monkeypatch):
+@pytest_asyncio.fixture
+async def client():
     """
-    GET /games sin params:
-    - Debe devolver 200
-    - (Por defecto) solo partidas no iniciadas y no llenas.
-    Nota: si no hay partidas, simplemente será [] y el loop no entra.
+    Cliente httpx sobre la app ASGI: las requests corren en el loop del
+    test, sin el hilo intermedio de TestClient.
     """
-    players = [uuid.uuid4()]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as c:
+        yield c
+    # Los endpoints de turno arrancan timers en el loop del test
+    turn_timer_manager.stop_all()
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_games(self, full=False, ready=False):
-            assert full is False
-            assert ready is False
-            return [make_game(players=players, ready=False, max_players=4)]
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+def _fake_get_db():
+    yield object()
 
-    r = client.get("/games")
-    assert r.status_code == 200
-    data = r.json()
-    assert isinstance(data, list)
 
-    for g in data:
-        assert not g["ready"]
-        assert len(g["players_ids"]) < g["max_players"]
+@pytest.fixture(scope="module", autouse=True)
+def fake_db_dependency():
+    """Avoid hitting the real database in endpoint tests."""
+    app.dependency_overrides[get_db] = _fake_get_db
+    try:
+        yield
+    finally:
+        app.dependency_overrides.pop(get_db, None)
 
 
-def test_list_games_with_flags(monkeypatch):
+@pytest.fixture
+def patch_endpoints():
     """
-    GET /games con full=true y ready=true:
-    - Debe devolver 200
-    - Puede incluir partidas llenas e iniciadas (no hacemos aserciones de filtro).
+    Reemplaza atributos de app.game.endpoints y los restaura al final del
+    test. Guarda el original solo la primera vez que se pisa cada nombre.
     """
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_games(self, full=False, ready=False):
-            assert full is True
-            assert ready is True
-            return [make_game(ready=True, players=[uuid.uuid4()])]
+    saved = {}
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+    def _apply(**attrs):
+        for name, value in attrs.items():
+            saved.setdefault(name, getattr(endpoints, name))
+            setattr(endpoints, name, value)
 
-    r = client.get("/games", params={"full": True, "ready": True})
-    assert r.status_code == 200
-    data = r.json()
-    assert isinstance(data, list)
+    yield _apply
+    for name, value in saved.items():
+        setattr(endpoints, name, value)
 
-def test_list_games_full_true_ready_false(monkeypatch):
-    """
-    GET /games con full=true y ready=false:
-    - 200 OK
-    - Debe incluir SOLO partidas NO iniciadas (ready == False).
-    - Puede incluir llenas o no (no se restringe por cantidad de jugadores).
-    """
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_games(self, full=False, ready=False):
-            assert full is True
-            assert ready is False
-            return [make_game(ready=False)]
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+@pytest.fixture
+def use_service(patch_endpoints):
+    """Instala un DummyGameService con los resultados dados y lo devuelve."""
+    def _install(**results):
+        svc = DummyGameService(**results)
+        patch_endpoints(GameService=lambda db: svc)
+        return svc
+    return _install
 
-    r = client.get("/games", params={"full": True, "ready": False})
-    assert r.status_code == 200
-    data = r.json()
-    assert isinstance(data, list)
 
-    for g in data:
-        assert not g["ready"]  # sigue filtrando iniciadas
+@pytest.fixture
+def dummy_manager(patch_endpoints):
+    manager = DummyManager()
+    patch_endpoints(manager=manager)
+    return manager
+
 
+@pytest.fixture
+def dummy_menu(patch_endpoints):
+    menu = DummyMenuManager()
+    patch_endpoints(menu_manager=menu)
+    return menu
 
-def test_list_games_full_false_ready_true(monkeypatch):
+
+def make_game(
+    game_id=None,
+    players=None,
+    max_players=4,
+    ready=False,
+):
+    return _TEMPLATE_GAME.model_copy(update={
+        "id": game_id or next(uids),
+        "players_ids": players or [],
+        "max_players": max_players,
+        "ready": ready,
+    })
+
+
+@pytest.mark.parametrize("params, full, ready", [
+    (None, False, False),                          # sin params: valores por defecto
+    ({"full": True, "ready": True}, True, True),
+    ({"full": True, "ready": False}, True, False),
+    ({"full": False, "ready": True}, False, True),
+])
+@pytest.mark.asyncio
+async def test_list_games(use_service, client, params, full, ready):
     """
-    GET /games con full=false y ready=true:
-    - 200 OK
-    - Debe incluir SOLO partidas NO llenas (len(players_ids) < max_players).
-    - Pueden estar iniciadas o no (no se filtra por ready).
+    GET /games con cada combinación de full/ready:
+    - Debe devolver 200 y pasar los flags tal cual al servicio.
+    - Con ready=false solo hay partidas NO iniciadas.
+    - Con full=false solo hay partidas NO llenas (len(players_ids) < max_players).
     """
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_games(self, full=False, ready=False):
-            assert full is False
-            assert ready is True
-            return [make_game(players=[uuid.uuid4()], max_players=2)]
+    svc = use_service(get_games=[make_game(players=[next(uids)], ready=ready, max_players=2)])
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    r = client.get("/games", params={"full": False, "ready": True})
+    r = await client.get("/games", params=params)
     assert r.status_code == 200
+    assert svc.calls == [("get_games", (), {"full": full, "ready": ready})]
     data = r.json()
-    assert isinstance(data, list)
+    assert len(data) == 1  # la única partida que devuelve el servicio
 
     for g in data:
-        assert len(g["players_ids"]) < g["max_players"]  # sigue filtrando llenas
-
+        if not ready:
+            assert not g["ready"]  # sigue filtrando iniciadas
+        if not full:
+            assert len(g["players_ids"]) < g["max_players"]  # sigue filtrando llenas
 
-def test_get_game_by_id_not_found(monkeypatch):
-    fake_id = uuid.uuid4()
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_game_by_id(self, game_id): return None
+@pytest.mark.asyncio
+async def test_get_game_by_id_not_found(use_service, client):
+    fake_id = next(uids)
+    use_service(get_game_by_id=None)
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    response = client.get(f"/games/{fake_id}")
+    response = await client.get(f"/games/{fake_id}")
     assert response.status_code == 404
     assert response.json()["detail"] == "Juego no encontrado"
 
 
-def test_get_game_by_id_ok(monkeypatch):
-    fake_id = uuid.uuid4()
-    returned_game = make_game(game_id=fake_id)
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_game_by_id(self, game_id): return returned_game
+@pytest.mark.asyncio
+async def test_get_game_by_id_ok(use_service, client):
+    fake_id = next(uids)
+    fake_id_s = str(fake_id)
+    use_service(get_game_by_id=make_game(game_id=fake_id))
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    response = client.get(f"/games/{fake_id}")
+    response = await client.get("/games/" + fake_id_s)
     assert response.status_code == 200
     payload = response.json()
-    assert payload["id"] == str(fake_id)
+    assert payload["id"] == fake_id_s
     assert payload["name"] == "Test Game"
 
 
-def test_create_game_endpoint(monkeypatch):
+@pytest.mark.asyncio
+async def test_create_game_endpoint(use_service, dummy_menu, client):
     created_game = make_game(players=[])
-    captured = {}
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def create_game(self, payload):
-            captured["payload_type"] = type(payload).__name__
-            return created_game
-
-    class DummyMenuManager:
-        def __init__(self): self.messages = []
-        async def broadcast(self, message): self.messages.append(message)
-
-    dummy_menu = DummyMenuManager()
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", dummy_menu)
+    svc = use_service(create_game=created_game)
 
-    response = client.post(
+    response = await client.post(
         "/games",
-        json={
-            "name": "New Game",
-            "host_name": "Host",
-            "birthday": "1990-01-01",
-            "min_players": 2,
-            "max_players": 4,
-        },
+        content=_CREATE_GAME_BODY,
+        headers=_JSON_HEADERS,
     )
 
     assert response.status_code == 201
     assert response.json()["id"] == str(created_game.id)
-    assert captured["payload_type"] == "GameInDTO"
+    _, (payload,), _ = svc.calls[0]
+    assert type(payload).__name__ == "GameInDTO"
     assert dummy_menu.messages
     assert dummy_menu.messages[0]["type"] == "gameAdd"
 
 
-def test_add_player_game_unavailable(monkeypatch):
-    """Caso donde el juego no está disponible"""
-    game_id = uuid.uuid4()
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        
-        def get_game_by_id(self, gid): 
-            game = make_game(game_id=game_id)
-            game.password = None  # Juego sin contraseña
-            return game
-            
-        def add_player(self, game_id, player_data): 
-            return None  # Simula que el juego no está disponible
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    response = client.post(
-        f"/games/{game_id}/players",
-        json={"name": "Alice", "birthday": "2000-01-01"},
-    )
-
-    assert response.status_code == 400
-    assert response.json()["detail"] == "GameUnavailable"
-
+# Escenarios de POST /games/{id}/players:
+# (jugadores en la partida, ¿add_player lo agrega?, ¿se encuentra el juego?,
+#  status esperado, detail esperado, mensaje esperado al lobby)
+_ADD_PLAYER_SCENARIOS = {
+    "unavailable": (0, False, True, 400, "GameUnavailable", None),
+    "not_found": (0, True, False, 404, "GameNotFound", None),
+    "full": (2, True, True, 200, None, "gameUnavailable"),
+    "not_full": (1, True, True, 200, None, "joinPlayerToGame"),
+}
 
-def test_add_player_game_not_found(monkeypatch):
-    game_id = uuid.uuid4()
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        def add_player(self, game_id, player_data): return uuid.uuid4()
-        def get_game_by_id(self, game_id): return None
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    response = client.post(
-        f"/games/{game_id}/players",
-        json={"name": "Alice", "birthday": "2000-01-01"},
+@pytest.mark.parametrize("scenario", list(_ADD_PLAYER_SCENARIOS))
+@pytest.mark.asyncio
+async def test_add_player(use_service, dummy_manager, dummy_menu, client, scenario):
+    n_players, added, found, expected_status, expected_detail, menu_type = (
+        _ADD_PLAYER_SCENARIOS[scenario]
     )
-
-    assert response.status_code == 404
-    assert response.json()["detail"] == "GameNotFound"
-
-
-def test_add_player_game_full_broadcast(monkeypatch):
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
-    updated_game = make_game(
+    game_id = next(uids)
+    player_id = next(uids)
+    gid_s, pid_s = str(game_id), str(player_id)
+    game = make_game(
         game_id=game_id,
-        players=[uuid.uuid4(), uuid.uuid4()],
+        players=[next(uids) for _ in range(n_players)],
         max_players=2,
     )
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def add_player(self, gid, player_data): return player_id
-        def get_game_by_id(self, gid): return updated_game
-
-    class DummyManager:
-        def __init__(self): self.calls = []
-        async def broadcast_to_game(self, gid, payload): self.calls.append((gid, payload))
-
-    class DummyMenuManager:
-        def __init__(self): self.messages = []
-        async def broadcast(self, message): self.messages.append(message)
-
-    dummy_manager = DummyManager()
-    dummy_menu = DummyMenuManager()
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-    monkeypatch.setattr("app.game.endpoints.manager", dummy_manager)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", dummy_menu)
-
-    response = client.post(
-        f"/games/{game_id}/players",
-        json={"name": "Alice", "birthday": "2000-01-01"},
-    )
-
-    assert response.status_code == 200
-    assert response.json() == {
-        "game_id": str(game_id),
-        "player_id": str(player_id),
-    }
-    assert dummy_manager.calls
-    broadcast_payload = dummy_manager.calls[0][1]
-    assert broadcast_payload["type"] == "playerJoined"
-    assert broadcast_payload["data"]["game_id"] == str(game_id)
-    assert dummy_menu.messages
-    assert dummy_menu.messages[-1]["type"] == "gameUnavailable"
-
-
-def test_add_player_game_not_full(monkeypatch):
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
-    updated_game = make_game(
-        game_id=game_id,
-        players=[uuid.uuid4()],
-        max_players=2,
+    use_service(
+        get_game_by_id=game if found else None,
+        add_player=player_id if added else None,
     )
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        def add_player(self, gid, player_data): return player_id
-        def get_game_by_id(self, gid): return updated_game
-
-    class DummyManager:
-        def __init__(self): self.calls = []
-        async def broadcast_to_game(self, gid, payload): self.calls.append((gid, payload))
-
-    class DummyMenuManager:
-        def __init__(self): self.messages = []
-        async def broadcast(self, message): self.messages.append(message)
-
-    dummy_manager = DummyManager()
-    dummy_menu = DummyMenuManager()
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-    monkeypatch.setattr("app.game.endpoints.manager", dummy_manager)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", dummy_menu)
-
-    response = client.post(
-        f"/games/{game_id}/players",
-        json={"name": "Alice", "birthday": "2000-01-01"},
+    response = await client.post(
+        f"/games/{gid_s}/players",
+        content=_ADD_PLAYER_BODY,
+        headers=_JSON_HEADERS,
     )
 
-    assert response.status_code == 200
-    assert dummy_manager.calls[0][1]["type"] == "playerJoined"
-    assert dummy_manager.calls[0][1]["data"]["player_id"] == str(player_id)
-    assert dummy_manager.calls[0][1]["data"]["player_name"] == "Alice"
-    assert dummy_menu.messages[0]["type"] == "joinPlayerToGame"
-
+    assert response.status_code == expected_status
+    assert [m["type"] for m in dummy_menu.messages] == ([menu_type] if menu_type else [])
+    body = response.json()
+    if expected_detail:
+        assert body["detail"] == expected_detail
+        assert dummy_manager.calls == []
+        return
 
-def test_start_game_conditions_not_met(monkeypatch):
-    game_id = uuid.uuid4()
+    assert body == {"game_id": gid_s, "player_id": pid_s}
+    assert dummy_manager.calls == [(
+        game_id,
+        {"type": "playerJoined",
+         "data": {"game_id": gid_s, "player_id": pid_s, "player_name": "Alice"}},
+    )]
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        def can_start(self, gid): return False
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+@pytest.mark.asyncio
+async def test_start_game_conditions_not_met(use_service, client):
+    game_id = next(uids)
+    use_service(can_start=False)
 
-    response = client.post(f"/games/{game_id}/start")
+    response = await client.post(f"/games/{game_id}/start")
 
     assert response.status_code == 400
     assert response.json()["detail"] == "StartConditionsNotMet"
 
 
-def test_start_game_not_found(monkeypatch):
-    game_id = uuid.uuid4()
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def can_start(self, gid): return True
-        def start_game(self, gid): pass
-        def get_game_by_id(self, gid): return None
+@pytest.mark.asyncio
+async def test_start_game_not_found(use_service, client):
+    game_id = next(uids)
+    use_service(can_start=True, start_game=None, get_game_by_id=None)
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    response = client.post(f"/games/{game_id}/start")
+    response = await client.post(f"/games/{game_id}/start")
 
     assert response.status_code == 404
     assert response.json()["detail"] == "GameNotFound"
 
 
-def test_start_game_success(monkeypatch):
-    game_id = uuid.uuid4()
-    updated_game = make_game(game_id=game_id)
-    flags = {"started": False}
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def can_start(self, gid): return True
-        def start_game(self, gid): flags["started"] = True
-        def get_game_by_id(self, gid): return updated_game
-        def handler_end_timer(self, gid): return None
-
-    class DummyManager:
-        def __init__(self): self.calls = []
-        async def broadcast_to_game(self, gid, payload): self.calls.append((gid, payload))
-
-    class DummyMenuManager:
-        def __init__(self): self.messages = []
-        async def broadcast(self, message): self.messages.append(message)
-
-    dummy_manager = DummyManager()
-    dummy_menu = DummyMenuManager()
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-    monkeypatch.setattr("app.game.endpoints.manager", dummy_manager)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", dummy_menu)
+@pytest.mark.asyncio
+async def test_start_game_success(use_service, dummy_manager, dummy_menu, client):
+    game_id = next(uids)
+    svc = use_service(
+        can_start=True,
+        start_game=None,
+        get_game_by_id=make_game(game_id=game_id),
+        handler_end_timer=None,
+    )
 
-    response = client.post(f"/games/{game_id}/start")
+    response = await client.post(f"/games/{game_id}/start")
 
     assert response.status_code == 204
-    assert flags["started"] is True
+    assert ("start_game", (game_id,), {}) in svc.calls
     assert dummy_manager.calls[0][1]["type"] == "GameStarted"
     assert dummy_menu.messages[0]["type"] == "gameUnavailable"
 
 
-def test_get_turn_not_found(monkeypatch):
+@pytest.mark.asyncio
+async def test_get_turn_not_found(use_service, client):
     """
     GET /turn/{game_id} cuando no hay turno:
     - Debe devolver 404 con detail="PlayerNotFound"
     """
-    fake_id = uuid.uuid4()
-    fake_game = MagicMock(ready=True)
+    fake_id = next(uids)
+    # el servicio devuelve None como turno actual
+    use_service(get_turn=None, get_game_by_id=MagicMock(ready=True))
 
-    # mock del servicio para devolver None
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_turn(self, game_id): return None
-        def get_game_by_id(self, game_id): return fake_game
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    r = client.get(f"/games/turn/{fake_id}")
+    r = await client.get(f"/games/turn/{fake_id}")
     assert r.status_code == 404
     assert r.json()["detail"] == "PlayerNotFound"
 
 
-def test_get_turn_ok(monkeypatch):
+@pytest.mark.asyncio
+async def test_get_turn_ok(monkeypatch, use_service, client):
     """
     GET /turn/{game_id} cuando existe turno:
     - Debe devolver 200 con {"id": <uuid>}
     """
-    fake_id = uuid.uuid4()
-    fake_game = MagicMock(ready=True)
+    fake_id = next(uids)
+    fake_id_s = str(fake_id)
 
     fake_game_state = types.SimpleNamespace(
         turn_state=TurnState.IDLE,
@@ -447,14 +371,11 @@ def test_get_turn_ok(monkeypatch):
         sfp_players=None
     )
 
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_turn(self, game_id): return str(fake_id)
-        def get_game_by_id(self, game_id): return fake_game
-        def get_turn_state(self,game_id): return fake_game_state
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+    use_service(
+        get_turn=fake_id_s,
+        get_game_by_id=MagicMock(ready=True),
+        get_turn_state=fake_game_state,
+    )
     monkeypatch.setattr(
     "app.game.endpoints.turn_timer_manager.get_remaining_time",
     lambda game_id: 1.0
@@ -465,10 +386,10 @@ def test_get_turn_ok(monkeypatch):
     )
 
 
-    r = client.get(f"/games/turn/{fake_id}")
+    r = await client.get("/games/turn/" + fake_id_s)
     assert r.status_code == 200
     assert r.json() == {
-        "current_turn": str(fake_id),
+        "current_turn": fake_id_s,
         "turn_state": "IDLE",
         "remaining_time": 1.0,
         "timer_is_paused": True,
@@ -481,67 +402,53 @@ def test_get_turn_ok(monkeypatch):
         "sfp_players": None
     }
     
-def get_turn_game_not_ready(monkeypatch):
+@pytest.mark.asyncio
+async def test_get_turn_game_not_ready(use_service, client):
     """
     GET /turn/{game_id} cuando el juego no esta listo
     - Debe devolver 409
     """
-    fake_id = uuid.uuid4()
-    fake_game = MagicMock(ready=False)
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def get_turn(self, game_id): return str(fake_id)
-        def get_game_by_id(self, game_id): return fake_game
+    fake_id_s = str(next(uids))
+    use_service(get_turn=fake_id_s, get_game_by_id=MagicMock(ready=False))
 
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-
-    r = client.get(f"/games/turn/{fake_id}")
+    r = await client.get("/games/turn/" + fake_id_s)
     assert r.status_code == 409
     assert r.json()["detail"] == "La partida aún no ha comenzado"
 
 
-def test_post_turn_not_found(monkeypatch):
+@pytest.mark.asyncio
+async def test_post_turn_not_found(use_service, dummy_manager, client):
     """
     POST /turn/{game_id} cuando no hay próximo jugador:
     - Debe devolver 404 con detail="PlayerNotFound"
     """
-    fake_id = uuid.uuid4()
-    fake_game_turn_state = MagicMock(turn_state=TurnState.END_TURN)
-
-    class DummyGameService:
-        def __init__(self, db): pass
-        def next_player(self, game_id): 
-            raise ValueError(f"El juego {game_id} no esta iniciado o no tiene suficientes jugadores")
-        def get_turn_state(self,game_id): return fake_game_turn_state
-
-    async def fake_broadcast(*args, **kwargs): return None
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
-    monkeypatch.setattr("app.game.endpoints.manager.broadcast_to_game", fake_broadcast)
+    fake_id_s = str(next(uids))
+    use_service(
+        next_player=ValueError(f"El juego {fake_id_s} no esta iniciado o no tiene suficientes jugadores"),
+        get_turn_state=MagicMock(turn_state=TurnState.END_TURN),
+    )
 
-    r = client.post(f"games/turn/{fake_id}")
+    r = await client.post("games/turn/" + fake_id_s)
     assert r.status_code == 404
-    assert f"El juego {fake_id}" in r.json()["detail"]
+    assert f"El juego {fake_id_s}" in r.json()["detail"]
 
 
-def test_post_turn_ok(monkeypatch):
+@pytest.mark.asyncio
+async def test_post_turn_ok(patch_endpoints, use_service, dummy_manager, client):
     """
     POST /turn/{game_id} cuando hay próximo jugador:
     - Debe devolver 200 con {"id": <uuid>}
     - Debe invocar broadcast_to_game
     """
-    next_player_id = uuid.uuid4()
-    fake_game_turn_state = MagicMock(turn_state=TurnState.END_TURN)
+    next_player_id = next(uids)
+    next_player_id_s = str(next_player_id)
 
     # Mock GameService
-    class DummyGameService:
-        def __init__(self, db): pass
-        def next_player(self, game_id): return next_player_id
-        def get_turn_state(self,game_id): return fake_game_turn_state
-        def handler_end_timer(self, game_id): return None
-
-    monkeypatch.setattr("app.game.endpoints.GameService", DummyGameService)
+    use_service(
+        next_player=next_player_id,
+        get_turn_state=MagicMock(turn_state=TurnState.END_TURN),
+        handler_end_timer=None,
+    )
 
     # Mock CardService.update_draft y query_draft
     class DummyCardService:
@@ -549,63 +456,41 @@ def test_post_turn_ok(monkeypatch):
         def update_draft(self,db, game_id): return None  # simulamos que no hay cartas para actualizar
         def query_draft(self,db, game_id): return []
 
-    monkeypatch.setattr("app.game.endpoints.CardService", DummyCardService)
-
-    # Mock broadcast_to_game (async)
-    called = {}
-    async def fake_broadcast(self, game_id, payload):
-        called["done"] = True
-        called["payload"] = payload
+    patch_endpoints(CardService=DummyCardService)
 
-    monkeypatch.setattr("app.game.endpoints.manager", type("Manager", (), {"broadcast_to_game": fake_broadcast})())
-
-    game_id = uuid.uuid4()
-    r = client.post(f"/games/turn/{game_id}")
+    game_id = next(uids)
+    r = await client.post(f"/games/turn/{game_id}")
     assert r.status_code == 200
-    assert r.json() == {"id": str(next_player_id)}  # convertir UUID a str para comparación
+    assert r.json() == {"id": next_player_id_s}
     # Como no hay cartas para actualizar, solo se hace turnChange
-    assert called["done"] is True
-    assert called["payload"]["type"] == "turnChange"
-    assert called["payload"]["data"]["player_id"] == str(next_player_id)
+    assert len(dummy_manager.calls) == 1
+    payload = dummy_manager.calls[0][1]
+    assert payload["type"] == "turnChange"
+    assert payload["data"]["player_id"] == next_player_id_s
 
-def test_turn_change_ends_game(mocker):
+@pytest.mark.asyncio
+async def test_turn_change_ends_game(use_service, dummy_manager, client):
     """
     Prueba que el endpoint de cambio de turno maneja correctamente el fin de la partida.
     """
-    game_id = uuid.uuid4()
-    
-    # Creamos un objeto falso de EndGameResult que el servicio simulará devolver
-    fake_end_result = EndGameResult(
-        reason=GameEndReason.DECK_EMPTY,
-        winning_team=WinningTeam.MURDERERS,
-        winners=[],
-        player_roles=[]
+    game_id = next(uids)
+    use_service(
+        get_turn_state=MagicMock(turn_state=TurnState.END_TURN),
+        next_player=_FAKE_END_RESULT,
+        handler_end_timer=None,
     )
-    fake_game_turn_state=MagicMock(turn_state=TurnState.END_TURN)
-    mocker.patch(
-        'app.game.endpoints.GameService.get_turn_state',
-        return_value=fake_game_turn_state
-    )
-
-    mocker.patch(
-        'app.game.endpoints.GameService.next_player',
-        return_value=fake_end_result
-    )
-    
-    mock_broadcast = mocker.patch('app.game.endpoints.manager.broadcast_to_game')
 
-    response = client.post(f"/games/turn/{game_id}")
+    response = await client.post(f"/games/turn/{game_id}")
     
     # Verificamos la respuesta HTTP
     assert response.status_code == 200
     assert response.json() == {"detail": "Game has ended"}
     
-    # Verificamos que se haya llamado al broadcast del websocket
-    mock_broadcast.assert_called_once()
+    # Verificamos que se haya hecho un único broadcast al websocket
+    assert len(dummy_manager.calls) == 1
     
-    # Verificamos que el broadcast se haya llamado con los datos correctos
-    call_args = mock_broadcast.call_args[0]
-    broadcast_payload = call_args[1]
+    # Verificamos que el broadcast se haya hecho con los datos correctos
+    broadcast_payload = dummy_manager.calls[0][1]
     assert broadcast_payload["type"] == "gameEnded"
     assert broadcast_payload["data"]["reason"] == "DECK_EMPTY"
 
@@ -690,18 +575,20 @@ def test_remove_password_hides_password_from_broadcasts():
     assert result2["name"] == "Test Game 2"
 
 
-def test_leave_game_player_success(monkeypatch):
+@pytest.mark.asyncio
+async def test_leave_game_player_success(patch_endpoints, dummy_manager, dummy_menu, client):
     """
     Prueba que un jugador (que NO es el host) puede abandonar la partida.
     - Devuelve 200 OK.
     - Devuelve el game_data actualizado (sin el jugador).
     - Emite los websockets correctos ('playerLeft' y 'removePlayerFromGame').
     """
-    game_id = uuid.uuid4()
-    host_id = uuid.uuid4()
-    player_to_remove_id = uuid.uuid4()
+    game_id = next(uids)
+    host_id = next(uids)
+    player_to_remove_id = next(uids)
+    gid_s, removed_s = str(game_id), str(player_to_remove_id)
 
-    mock_game_service = MagicMock()
+    mock_game_service = MagicMock(spec=GameService)
 
     fake_player_host = types.SimpleNamespace(id=host_id, name="HostPlayer")
     fake_player_to_remove = types.SimpleNamespace(id=player_to_remove_id, name="LeaverPlayer")
@@ -723,14 +610,9 @@ def test_leave_game_player_success(monkeypatch):
         players_ids=[host_id] # <-- Solo el host
     )
     
-    monkeypatch.setattr("app.game.endpoints.GameService", lambda db: mock_game_service)
-
-    mock_manager = MagicMock(broadcast_to_game=AsyncMock())
-    mock_menu_manager = MagicMock(broadcast=AsyncMock())
-    monkeypatch.setattr("app.game.endpoints.manager", mock_manager)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", mock_menu_manager)
+    patch_endpoints(GameService=lambda db: mock_game_service)
 
-    response = client.delete(f"/games/{game_id}/players/{player_to_remove_id}")
+    response = await client.delete(f"/games/{gid_s}/players/{removed_s}")
 
     assert response.status_code == 200
     json_data = response.json()
@@ -738,31 +620,33 @@ def test_leave_game_player_success(monkeypatch):
     assert "game_data" not in json_data # Verificamos que no esté
     assert "game_data_json" not in json_data # Verificamos que no esté
     
-    mock_manager.broadcast_to_game.assert_called_once_with(
+    assert dummy_manager.calls == [(
         game_id,
         {"type": "playerLeft", 
          "data": {
-             "game_id": str(game_id), 
-             "player_id": str(player_to_remove_id),
+             "game_id": gid_s, 
+             "player_id": removed_s,
              "player_name": "LeaverPlayer"
          }},
-    )
-    mock_menu_manager.broadcast.assert_called_once()
-    assert mock_menu_manager.broadcast.call_args[0][0]["type"] == "removePlayerFromGame"
+    )]
+    assert len(dummy_menu.messages) == 1
+    assert dummy_menu.messages[0]["type"] == "removePlayerFromGame"
 
 
-def test_leave_game_host_success(monkeypatch):
+@pytest.mark.asyncio
+async def test_leave_game_host_success(patch_endpoints, dummy_manager, dummy_menu, client):
     """
     Prueba que si el HOST abandona la partida, el juego se elimina.
     - Devuelve 200 OK.
     - Devuelve el detalle "Game deleted".
     - Emite los websockets correctos ('GameCancelled' y 'gameRemoved').
     """
-    game_id = uuid.uuid4()
-    host_id = uuid.uuid4()
-    other_player_id = uuid.uuid4()
+    game_id = next(uids)
+    host_id = next(uids)
+    other_player_id = next(uids)
+    gid_s = str(game_id)
 
-    mock_game_service = MagicMock()
+    mock_game_service = MagicMock(spec=GameService)
 
     fake_player_host = MagicMock(id=host_id, name="HostPlayer")
     fake_player_other = MagicMock(id=other_player_id, name="OtherPlayer")
@@ -775,28 +659,23 @@ def test_leave_game_host_success(monkeypatch):
     mock_game_service.remove_player.return_value = True
     
     
-    monkeypatch.setattr("app.game.endpoints.GameService", lambda db: mock_game_service)
-
-    mock_manager = MagicMock(broadcast_to_game=AsyncMock())
-    mock_menu_manager = MagicMock(broadcast=AsyncMock())
-    monkeypatch.setattr("app.game.endpoints.manager", mock_manager)
-    monkeypatch.setattr("app.game.endpoints.menu_manager", mock_menu_manager)
+    patch_endpoints(GameService=lambda db: mock_game_service)
 
-    response = client.delete(f"/games/{game_id}/players/{host_id}")
+    response = await client.delete(f"/games/{gid_s}/players/{host_id}")
 
     assert response.status_code == 200
     json_data = response.json()
     assert json_data["detail"] == "Game deleted successfully"
     assert "game_data" not in json_data
 
-    mock_manager.broadcast_to_game.assert_called_once_with(
+    assert dummy_manager.calls == [(
         game_id, 
         {"type": "GameCancelled", 
-         "data": {"game_id": str(game_id), "reason": "HostLeft"}}
-    )
-    mock_menu_manager.broadcast.assert_called_once_with(
-        {"type": "gameRemoved", "data": {"game_id": str(game_id)}}
-    )
+         "data": {"game_id": gid_s, "reason": "HostLeft"}}
+    )]
+    assert dummy_menu.messages == [
+        {"type": "gameRemoved", "data": {"game_id": gid_s}}
+    ]
 
 
 @pytest.mark.parametrize("game_password, provided_password, expected_status, expected_detail", [
@@ -812,59 +691,40 @@ def test_leave_game_host_success(monkeypatch):
     (None, "", 200, None),  # Password vacía
 ])
 
-def test_add_player_password_scenarios(monkeypatch, game_password, provided_password, expected_status, expected_detail):
+@pytest.mark.asyncio
+async def test_add_player_password_scenarios(use_service, dummy_manager, dummy_menu, game_password, provided_password, expected_status, expected_detail, client):
     """Test compacto para todos los escenarios de contraseña"""
-    game_id = uuid.uuid4()
-    player_id = uuid.uuid4()
+    game_id = next(uids)
+    player_id = next(uids)
     
     # Mock del juego
     game = make_game(game_id=game_id)
     game.password = game_password
-    
+
+    # Si el alta prospera, get_game_by_id devuelve el juego actualizado
     updated_game = make_game(game_id=game_id)
     updated_game.password = game_password
 
-    class DummyGameService:
-        def __init__(self, db): pass
-        
-        def get_game_by_id(self, gid): 
-            return game if gid == game_id else None
-            
-        def add_player(self, gid, player_data): 
-            return player_id if expected_status == 200 else None
-            
-        # Método para obtener el juego actualizado después de agregar jugador
-        def get_updated_game(self, gid): 
-            return updated_game if expected_status == 200 else None
-
-    # Mock que reemplaza get_game_by_id después de agregar jugador
-    def mock_get_game_after_add(gid):
-        return updated_game if expected_status == 200 else None
-
-    service_instance = DummyGameService(None)
-    monkeypatch.setattr("app.game.endpoints.GameService", lambda db: service_instance)
-    
-    # Mock para la segunda llamada a get_game_by_id
-    if expected_status == 200:
-        monkeypatch.setattr(service_instance, "get_game_by_id", mock_get_game_after_add)
-
-    # Mocks básicos
-    monkeypatch.setattr("app.game.endpoints.manager.broadcast_to_game", AsyncMock())
-    monkeypatch.setattr("app.game.endpoints.menu_manager.broadcast", AsyncMock())
+    use_service(
+        get_game_by_id=updated_game if expected_status == 200 else game,
+        add_player=player_id if expected_status == 200 else None,
+    )
 
     # Preparar request
     params = {"password": provided_password} if provided_password is not None else {}
     
     # Ejecutar test
-    response = client.post(
+    response = await client.post(
         f"/games/{game_id}/players",
         params=params,
-        json={"name": "Test", "birthday": "2000-01-01"},
+        content=_ADD_PLAYER_BODY,
+        headers=_JSON_HEADERS,
     )
 
     # Verificaciones
     assert response.status_code == expected_status
+    body = response.json()
     if expected_detail:
-        assert response.json()["detail"] == expected_detail
+        assert body["detail"] == expected_detail
     if expected_status == 200:
-        assert response.json()["player_id"] == str(player_id)
+        assert body["player_id"] == str(player_id)
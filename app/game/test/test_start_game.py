@@ -1,12 +1,7 @@
-import json
 import pytest
 from uuid import UUID, uuid4
 from datetime import date
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.db import Base
 from app.game.models import Game
 from app.game.dtos import GameInDTO
 from app.game.service import GameService
@@ -15,28 +10,6 @@ from app.player.service import PlayerService
 from app.card.service import CardService
 from app.card.enums import CardOwner
 
-# =======================
-# Fixtures de DB en memoria
-# =======================
-@pytest.fixture
-def db_session():
-    engine = create_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    yield session
-    session.close()
-
-
-# =======================
-# Fixture JSON de cartas
-# =======================
-@pytest.fixture
-def deck_json():
-    with open("app/card/deck.json", "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 # =======================
 # Test principal del flujo
 # =======================
@@ -8,7 +8,7 @@ from app.websocket.web_socket import router as ws_router
 from app.db import Base, engine
 from app.player.models import Player
 from app.game.models import Game
-from app.game.models import GameTurnState
+from app.game.models import GameTurnState, ensure_player_count_column, ensure_lookup_indexes
 from app.card.models import Card
 from app.secret.models import Secrets
 from fastapi.middleware.cors import CORSMiddleware
@@ -42,3 +42,5 @@ app.include_router(game_router)
 app.include_router(ws_router)
 
 Base.metadata.create_all(bind=engine)
+ensure_player_count_column(engine)
+ensure_lookup_indexes(engine)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import date
-from sqlalchemy import Column, String, Date, UUID, ForeignKey, Boolean
+from sqlalchemy import Column, String, Date, UUID, ForeignKey, Boolean, Index
 from sqlalchemy.orm import validates, relationship, Mapped, mapped_column
 
 from app.db import Base
@@ -8,6 +8,8 @@ from app.db import Base
 
 class Player(Base):
     __tablename__ = "players"
+    # Turnos y vecinos filtran por partida y ordenan por id
+    __table_args__ = (Index("ix_players_game_id_id", "game_id", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -3,10 +3,12 @@ from uuid import UUID
 
 from typing import List, Optional
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.player.dtos import PlayerInDTO, PlayerOutDTO
 from app.player.models import Player
+from app.game.models import Game
 from app.secret.models import Secrets
 from app.secret.enums import SecretType
 
@@ -52,20 +54,37 @@ class PlayerService:
         """Devuelve la lista de jugadores de un juego por game_id"""
         return self.db.query(Player).filter(Player.game_id == game_id).all()
     
-    def create_player(self, player_data: PlayerInDTO) -> PlayerOutDTO:
-        """Crea un nuevo jugador"""
+    def create_player(
+        self,
+        player_data: PlayerInDTO,
+        game_id: UUID | None = None,
+        commit: bool = True,
+    ) -> PlayerOutDTO:
+        """
+        Crea un nuevo jugador, opcionalmente ya asignado a un juego (cuyo
+        player_count se incrementa). Con commit=False solo hace flush y deja
+        el commit al llamador.
+        """
+        # Los validadores de Player pueden rechazar los datos: se construye
+        # antes de tocar la sesión para no dejar el incremento pendiente
         new_player = Player(
             id= uuid.uuid4(),
             name=player_data.name, 
-            birthday=player_data.birthday
+            birthday=player_data.birthday,
+            game_id=game_id
         )
-        self.db.add(new_player)
         try:
-            self.db.commit()
+            self.db.add(new_player)
+            self._shift_player_count(game_id, +1)
+            if commit:
+                self.db.commit()
+            else:
+                self.db.flush()
         except Exception as e:
             self.db.rollback()
             raise e
-        self.db.refresh(new_player)
+        if commit:
+            self.db.refresh(new_player)
         return PlayerOutDTO(
             id=new_player.id,
             name=new_player.name,
@@ -74,18 +93,33 @@ class PlayerService:
             social_disgrace=new_player.social_disgrace
         )
     
-    def assign_game_to_player(self, player_id: UUID, game_id: UUID) -> PlayerOutDTO:
-        """Asigna un juego a un jugador"""
+    def assign_game_to_player(
+        self,
+        player_id: UUID,
+        game_id: UUID,
+        commit: bool = True,
+    ) -> PlayerOutDTO:
+        """
+        Asigna un juego a un jugador y actualiza el player_count de la
+        partida que deja y de la nueva. Con commit=False solo hace flush.
+        """
         player = self.db.query(Player).filter(Player.id == player_id).first()
         if not player:
             raise ValueError("Player not found")
+        if player.game_id != game_id:
+            self._shift_player_count(player.game_id, -1)
+            self._shift_player_count(game_id, +1)
         player.game_id = game_id
         try:
-            self.db.commit()
+            if commit:
+                self.db.commit()
+            else:
+                self.db.flush()
         except Exception as e:
             self.db.rollback()
             raise e
-        self.db.refresh(player)
+        if commit:
+            self.db.refresh(player)
         return PlayerOutDTO(
             id=player.id,
             name=player.name,
@@ -95,10 +129,11 @@ class PlayerService:
         )
     
     def delete_player(self, player_id: UUID) -> UUID:
-        """Elimina un jugador por su ID"""
+        """Elimina un jugador por su ID, descontándolo de su partida"""
         player = self.db.query(Player).filter(Player.id == player_id).first()
         if not player:
             raise ValueError("Player not found")
+        self._shift_player_count(player.game_id, -1)
         self.db.delete(player)
         try:
             self.db.commit()
@@ -107,6 +142,19 @@ class PlayerService:
             raise e
         return player_id
 
+    def _shift_player_count(self, game_id: UUID | None, delta: int) -> None:
+        """
+        Ajusta games.player_count cuando un jugador entra (+1) o sale (-1)
+        de una partida. Todo cambio de partida de un jugador pasa por acá.
+        """
+        if game_id is None:
+            return
+        self.db.execute(
+            update(Game)
+            .where(Game.id == game_id)
+            .values(player_count=Game.player_count + delta)
+        )
+
     @staticmethod
     def update_social_disgrace(db: Session, player_id: UUID | None) -> None:
         """
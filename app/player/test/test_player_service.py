@@ -54,6 +54,16 @@ def test_create_player(player_service, db_session):
     assert db_player.social_disgrace is False
 
 
+def test_create_player_with_game_id(player_service, db_session):
+    game_id = uuid.uuid4()
+    new = PlayerInDTO(name="Juana", birthday=datetime.date(1991, 2, 2))
+    player = player_service.create_player(new, game_id=game_id)
+
+    assert player.game_id == game_id
+    db_player = db_session.query(Player).filter(Player.id == player.id).first()
+    assert db_player.game_id == game_id
+
+
 def test_get_players(player_service, db_session):
     new1 = PlayerInDTO(name="Ana", birthday=datetime.date(1995, 5, 5))
     new2 = PlayerInDTO(name="Luis", birthday=datetime.date(1988, 12, 12))
@@ -124,6 +134,31 @@ def test_delete_player(player_service, db_session):
     assert remaining is None
 
 
+def test_player_changes_keep_player_count(player_service, db_session):
+    """Crear, mover y eliminar jugadores actualiza player_count de cada partida."""
+    games = [
+        Game(id=uuid.uuid4(), name=f"G{i}", host_id=uuid.uuid4(), min_players=2, max_players=4)
+        for i in range(2)
+    ]
+    db_session.add_all(games)
+    db_session.commit()
+    first, second = games
+
+    player = player_service.create_player(
+        PlayerInDTO(name="Nómade", birthday=datetime.date(2000, 1, 1)), game_id=first.id
+    )
+    assert (first.player_count, second.player_count) == (1, 0)
+
+    player_service.assign_game_to_player(player.id, second.id)
+    assert (first.player_count, second.player_count) == (0, 1)
+
+    player_service.assign_game_to_player(player.id, second.id)  # misma partida: no cambia
+    assert second.player_count == 1
+
+    player_service.delete_player(player.id)
+    assert second.player_count == 0
+
+
 def test_delete_player_not_found(player_service):
     with pytest.raises(ValueError) as exc:
         player_service.delete_player(uuid.uuid4())  # UUID inexistente
@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import String, ForeignKey, Enum
+from sqlalchemy import String, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.types import Uuid
 from .enums import SecretType
@@ -8,6 +8,8 @@ from app.db import Base
 
 class Secrets(Base):
     __tablename__ = "secrets"
+    # are_all_other_secrets_revealed filtra por partida, revelado y rol
+    __table_args__ = (Index("ix_secrets_game_revealed_role", "game_id", "revealed", "role"),)
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     game_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("games.id"), nullable=False, index=True)
@@ -30,10 +30,12 @@ class SecretService:
     def create_secrets(
         db: Session, 
         game_id: UUID, 
-        jugadores_ids: list[UUID]
+        jugadores_ids: list[UUID],
+        commit: bool = True
     ) -> List[SecretOutDTO]:
         """
-        Crea todos los secretos de una partida, sin asignar dueño todavia
+        Crea todos los secretos de una partida, sin asignar dueño todavia.
+        Con commit=False solo hace flush y deja el commit al llamador.
         """
         path = Path(__file__).parent.parent / "secret" / "secrets.json"
 
@@ -84,10 +86,13 @@ class SecretService:
             db.add(secret)
             secrets_created.append(secret)
 
-        db.commit()
-        # Refrescar los objetos para obtener su estado actualizado
-        for secret in secrets_created:
-            db.refresh(secret)
+        if not commit:
+            db.flush()
+        else:
+            db.commit()
+            # Refrescar los objetos para obtener su estado actualizado
+            for secret in secrets_created:
+                db.refresh(secret)
 
         return [SecretService._to_dto(secret) for secret in secrets_created]
     
@@ -111,6 +116,7 @@ class SecretService:
         db: Session, 
         game_id: UUID, 
         jugadores_ids: list[UUID], 
+        commit: bool = True
     ) -> dict[UUID, List[SecretOutDTO]]:
         """
         Reparte secretos según las reglas:
@@ -165,7 +171,10 @@ class SecretService:
                 db.add(secret)
             resultado[jugador_id] = [SecretService._to_dto(s) for s in secrets]
 
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
 
         return resultado
 
@@ -21,16 +21,19 @@ from app.game.models import Game
 # FIXTURES
 # ---------------------------
 
+# Solo las tablas que usan estos tests
+_TEST_TABLES = [Game.__table__, Player.__table__, Secrets.__table__]
+
 @pytest.fixture(scope="function")
 def db_session():
     """Crea una BD SQLite en memoria (sin tocar la BD real)."""
     engine = create_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(engine, tables=_TEST_TABLES)
     Session = sessionmaker(bind=engine)
     session = Session()
     yield session
     session.close()
-    Base.metadata.drop_all(engine)
+    Base.metadata.drop_all(engine, tables=_TEST_TABLES)
 
 
 @pytest.fixture
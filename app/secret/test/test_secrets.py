@@ -10,15 +10,18 @@ from app.secret.enums import SecretType
 from app.player.models import Player  
 from app.game.models import Game
 
+# Solo las tablas que usan estos tests
+_TEST_TABLES = [Game.__table__, Player.__table__, Secrets.__table__]
+
 @pytest.fixture
 def session():
     engine = create_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(engine, tables=_TEST_TABLES)
     Session = sessionmaker(bind=engine)
     session = Session()
     yield session
     session.close()
-    Base.metadata.drop_all(engine)
+    Base.metadata.drop_all(engine, tables=_TEST_TABLES)
 
 def test_create_secret(session):
     player = Player(